@@ -0,0 +1,151 @@
+"""
+Measures the per-call overhead of calling into cfscc.
+
+Compares the old style of calling the library (attribute lookups on the
+library, a new out parameter per call and no prototypes) with the checked
+prototypes bound in fscc.cfscc and the unchecked functions that Port uses for
+the calls made on every frame. The unchecked read and write rows go through
+CfsccBackend.read() and write(), the path Port.read() and write() take, so
+they include the per-thread out parameter and error checking. The property
+rows are the calls behind a
+setting like Port.append_status: its getter (fscc_get_append_status) and its
+setter (fscc_enable_append_status). An invalid handle is used so no hardware
+is needed and the driver returns straight away. If the library reports an
+error for it, the backend rows include raising and catching that error.
+
+    python benchmarks/ctypes_overhead.py
+"""
+
+import ctypes
+import os
+import sys
+import timeit
+
+# Lets the benchmarks run from a checkout without installing the package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir))
+
+from fscc import cfscc
+from fscc.backend import CfsccBackend
+
+INVALID_HANDLE = -1
+SIZE = 4096
+
+
+def untyped_calls():
+    lib = ctypes.CDLL(cfscc.lib._name)
+    buf = bytes(SIZE)
+    data = b'U' * 64
+
+    def read():
+        bytes_read = ctypes.c_uint()
+        lib.fscc_read_with_blocking(INVALID_HANDLE, buf, SIZE,
+                                    ctypes.byref(bytes_read))
+
+    def write():
+        bytes_written = ctypes.c_uint()
+        lib.fscc_write_with_blocking(INVALID_HANDLE, data, len(data),
+                                     ctypes.byref(bytes_written))
+
+    def get_registers():
+        lib.fscc_get_registers(INVALID_HANDLE, bytes(24 * 8))
+
+    def get_property():
+        status = ctypes.c_uint()
+        lib.fscc_get_append_status(INVALID_HANDLE, ctypes.byref(status))
+
+    def set_property():
+        lib.fscc_enable_append_status(INVALID_HANDLE)
+
+    return read, write, get_registers, get_property, set_property
+
+
+def checked_calls():
+    buf = (ctypes.c_char * SIZE)()
+    data = b'U' * 64
+    value = ctypes.pointer(ctypes.c_uint())
+    registers = cfscc.FsccRegisters()
+
+    read_with_blocking = cfscc.fscc_read_with_blocking
+    write_with_blocking = cfscc.fscc_write_with_blocking
+    get_registers_ = cfscc.fscc_get_registers
+    get_append_status = cfscc.fscc_get_append_status
+    enable_append_status = cfscc.fscc_enable_append_status
+
+    def read():
+        read_with_blocking(INVALID_HANDLE, buf, SIZE, value)
+
+    def write():
+        write_with_blocking(INVALID_HANDLE, data, len(data), value)
+
+    def get_registers():
+        get_registers_(INVALID_HANDLE, registers)
+
+    def get_property():
+        status = ctypes.c_uint()
+        get_append_status(INVALID_HANDLE, ctypes.byref(status))
+
+    def set_property():
+        enable_append_status(INVALID_HANDLE)
+
+    return read, write, get_registers, get_property, set_property
+
+
+def unchecked_calls():
+    backend = CfsccBackend(cfscc)
+    port = CfsccBackend.Handle(0, cfscc.FSCC_HANDLE(INVALID_HANDLE))
+    handle = port.arg
+    buf = backend.buffer(memoryview(bytearray(SIZE)))
+    data = b'U' * 64
+    registers = cfscc.FsccRegisters()
+
+    backend_read = backend.read
+    backend_write = backend.write
+    get_registers_ = cfscc.unchecked_fscc_get_registers
+
+    # The settings have no unchecked bindings in fscc.cfscc, they are bound
+    # here to see what one would save
+    get_append_status = cfscc._bind('fscc_get_append_status', False)
+    enable_append_status = cfscc._bind('fscc_enable_append_status', False)
+
+    def read():
+        try:
+            backend_read(port, buf, SIZE)
+        except (OSError, ValueError):
+            pass
+
+    def write():
+        try:
+            backend_write(port, data)
+        except (OSError, ValueError):
+            pass
+
+    def get_registers():
+        get_registers_(handle, registers)
+
+    def get_property():
+        status = ctypes.c_uint()
+        get_append_status(handle, ctypes.byref(status))
+
+    def set_property():
+        enable_append_status(handle)
+
+    return read, write, get_registers, get_property, set_property
+
+
+def ns_per_call(func, number=20000):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e9
+
+
+if __name__ == '__main__':
+    names = ('read', 'write', 'get_registers', 'get_property',
+             'set_property')
+
+    print('{:<16}{:>12}{:>12}{:>12}'.format('ns per call', 'untyped',
+                                            'checked', 'unchecked'))
+
+    for name, untyped, checked, unchecked in zip(
+            names, untyped_calls(), checked_calls(), unchecked_calls()):
+        print('{:<16}{:>12.0f}{:>12.0f}{:>12.0f}'.format(
+            name, ns_per_call(untyped), ns_per_call(checked),
+            ns_per_call(unchecked)))
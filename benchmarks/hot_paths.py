@@ -0,0 +1,366 @@
+"""
+Measures the Python side of the read, write, register, settings and trailer
+parsing paths of Port.
+
+The ports are simulated (without pacing) so no hardware is needed and the
+numbers only cover the time spent in Python. Results can be saved as JSON and
+compared with a saved baseline, any benchmark that got slower by more than
+the threshold is reported and the exit status is 1.
+
+    python benchmarks/hot_paths.py --output baseline.json
+    python benchmarks/hot_paths.py --baseline baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+# Lets the benchmarks run from a checkout without installing the package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir))
+
+from fscc import Port
+from fscc.frame import STATUS_SIZE, TIMESTAMP_SIZE
+from fscc.sim import SimBackend
+
+SIZES = (1, 64, 1024, 16384, 65536)
+BATCH = 64
+
+# Upper limit on the frames queued up for the read benchmarks
+MAX_QUEUED_BYTES = 64 * 1024 * 1024
+
+
+def open_port(append_status=True, append_timestamp=True):
+    port = Port(0, append_status, append_timestamp,
+                backend=SimBackend(pacing=False))
+    port.memory_cap.input = 2 ** 31 - 1
+    return port
+
+
+def fill(port, data, count):
+    for _ in range(count):
+        port.write(data)
+
+
+def bench_write(size):
+    port = open_port()
+    data = b'U' * size
+
+    def run(number):
+        start = time.perf_counter()
+        for _ in range(number):
+            port.write(data)
+        elapsed = time.perf_counter() - start
+        port.purge()
+        return elapsed
+
+    return run, 1
+
+
+def bench_write_many(size):
+    port = open_port()
+    frames = [b'U' * size] * BATCH
+
+    def run(number):
+        start = time.perf_counter()
+        for _ in range(number):
+            port.write_many(frames)
+        elapsed = time.perf_counter() - start
+        port.purge()
+        return elapsed
+
+    return run, BATCH
+
+
+def bench_read(size):
+    port = open_port()
+    data = b'U' * size
+    max_size = size + 64
+
+    def run(number):
+        fill(port, data, number)
+        start = time.perf_counter()
+        for _ in range(number):
+            port.read(size=max_size)
+        return time.perf_counter() - start
+
+    return run, 1
+
+
+def bench_readinto(size):
+    port = open_port()
+    data = b'U' * size
+    buf = bytearray(size + 64)
+
+    def run(number):
+        fill(port, data, number)
+        start = time.perf_counter()
+        for _ in range(number):
+            port.readinto(buf)
+        return time.perf_counter() - start
+
+    return run, 1
+
+
+def bench_read_frames(size):
+    port = open_port()
+    port.rx_multiple = True
+    data = b'U' * size
+    max_bytes = BATCH * (size + STATUS_SIZE + TIMESTAMP_SIZE)
+
+    def run(number):
+        fill(port, data, number * BATCH)
+        start = time.perf_counter()
+        for _ in range(number):
+            port.read_frames(max_bytes, frame_size=size)
+        return time.perf_counter() - start
+
+    return run, BATCH
+
+
+def bench_parse(size):
+    port = open_port()
+    port.write(b'U' * size)
+    view, length = port._read_scratch(size + 64, None)
+
+    def run(number):
+        frame = port._decoder.frame
+        start = time.perf_counter()
+        for _ in range(number):
+            frame(view, length).data
+        return time.perf_counter() - start
+
+    return run, 1
+
+
+def bench_timestamps(size):
+    port = open_port()
+    port.rx_multiple = True
+    fill(port, b'U' * size, BATCH)
+    batch = port.read_frames(BATCH * (size + STATUS_SIZE + TIMESTAMP_SIZE),
+                             frame_size=size)
+
+    def run(number):
+        start = time.perf_counter()
+        for _ in range(number):
+            batch._timestamps = None
+            batch.timestamps
+        return time.perf_counter() - start
+
+    return run, BATCH
+
+
+def bench_register_get():
+    port = open_port()
+    registers = port.registers
+
+    def run(number):
+        start = time.perf_counter()
+        for _ in range(number):
+            registers.BGR
+        return time.perf_counter() - start
+
+    return run, 1
+
+
+def bench_register_set():
+    port = open_port()
+    registers = port.registers
+
+    def run(number):
+        start = time.perf_counter()
+        for _ in range(number):
+            registers.BGR = 0
+        return time.perf_counter() - start
+
+    return run, 1
+
+
+def bench_register_snapshot():
+    port = open_port()
+    registers = port.registers
+
+    def run(number):
+        start = time.perf_counter()
+        for _ in range(number):
+            registers.snapshot()
+        return time.perf_counter() - start
+
+    return run, 1
+
+
+def bench_setting_get():
+    port = open_port()
+
+    def run(number):
+        start = time.perf_counter()
+        for _ in range(number):
+            port.append_status
+        return time.perf_counter() - start
+
+    return run, 1
+
+
+def bench_setting_set():
+    port = open_port()
+
+    def run(number):
+        start = time.perf_counter()
+        for _ in range(number):
+            port.append_status = True
+        return time.perf_counter() - start
+
+    return run, 1
+
+
+def bench_to_json():
+    port = open_port()
+
+    def run(number):
+        start = time.perf_counter()
+        for _ in range(number):
+            port.to_json()
+        return time.perf_counter() - start
+
+    return run, 1
+
+
+def benchmarks():
+    """Gets the name and setup function of every benchmark."""
+    for name, setup in (('write', bench_write),
+                        ('write_many', bench_write_many),
+                        ('read', bench_read),
+                        ('readinto', bench_readinto),
+                        ('read_frames', bench_read_frames),
+                        ('parse', bench_parse),
+                        ('timestamps', bench_timestamps)):
+        for size in SIZES:
+            yield '{}/{}'.format(name, size), lambda s=setup, n=size: s(n)
+
+    yield 'registers/get', bench_register_get
+    yield 'registers/set', bench_register_set
+    yield 'registers/snapshot', bench_register_snapshot
+    yield 'settings/get', bench_setting_get
+    yield 'settings/set', bench_setting_set
+    yield 'to_json', bench_to_json
+
+
+def measure(run, frames_per_op, min_time=0.05, repeat=5, max_number=None):
+    """Times run() and returns the best ns per op and frames per second."""
+    number = 1
+
+    while True:
+        elapsed = run(number)
+
+        if elapsed >= min_time or number == max_number:
+            break
+
+        number *= 2
+
+        if max_number:
+            number = min(number, max_number)
+
+    best = min([elapsed] + [run(number) for _ in range(repeat - 1)])
+    ns_per_op = best / number * 1e9
+
+    return {
+        'ns_per_op': ns_per_op,
+        'frames_per_sec': frames_per_op * 1e9 / ns_per_op,
+    }
+
+
+def run_all(pattern=None, min_time=0.05, repeat=5):
+    results = {}
+
+    for name, setup in benchmarks():
+        if pattern and pattern not in name:
+            continue
+
+        run, frames_per_op = setup()
+
+        size = int(name.split('/')[1]) if name[-1].isdigit() else 0
+        max_number = max(1, MAX_QUEUED_BYTES // ((size + 64) * frames_per_op))
+
+        results[name] = measure(run, frames_per_op, min_time, repeat,
+                                max_number)
+        print('{:<24}{:>14.0f} ns/op{:>14.0f} frames/s'.format(
+            name, results[name]['ns_per_op'],
+            results[name]['frames_per_sec']))
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Prints the change from the baseline and returns the regressions."""
+    regressions = []
+
+    print()
+    print('{:<24}{:>14}{:>14}{:>10}'.format('', 'baseline', 'current',
+                                            'change'))
+
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+
+        old = baseline[name]['ns_per_op']
+        new = result['ns_per_op']
+        change = new / old - 1
+        flag = ''
+
+        if change > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+
+        print('{:<24}{:>14.0f}{:>14.0f}{:>+9.1%}{}'.format(name, old, new,
+                                                           change, flag))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split(
+        '\n\n')[0])
+    parser.add_argument('-k', dest='pattern',
+                        help='only run benchmarks whose name contains this')
+    parser.add_argument('--output', help='save the results to a JSON file')
+    parser.add_argument('--baseline',
+                        help='compare the results with a saved JSON file')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='slow down that counts as a regression '
+                             '(default 0.1 = 10%%)')
+    parser.add_argument('--min-time', type=float, default=0.05,
+                        help='seconds each timing should take at least')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = run_all(args.pattern, args.min_time, args.repeat)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'implementation': platform.python_implementation(),
+                'machine': platform.machine(),
+                'results': results,
+            }, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+
+        regressions = compare(results, baseline, args.threshold)
+
+        if regressions:
+            print()
+            print('{} regression(s): {}'.format(len(regressions),
+                                                ', '.join(regressions)))
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
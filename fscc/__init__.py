@@ -23,3 +23,15 @@ SOFTWARE.
 """
 
 from fscc.port import *
+from fscc.frame import Frame
+from fscc.group import PortGroup
+
+
+def __getattr__(name):
+    # The cfscc library is only loaded when something from it is used, so the
+    # package can be imported on machines that use another backend.
+    if name in ('lib', 'DLL_NAME') or name.startswith('fscc_'):
+        from fscc import cfscc
+        return getattr(cfscc, name)
+
+    raise AttributeError("module 'fscc' has no attribute '{}'".format(name))
@@ -0,0 +1,178 @@
+"""
+    MIT License
+
+Copyright (c) [2019] [Commtech]
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import asyncio
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import fscc.port
+
+_executor = None
+
+
+def set_executor(executor):
+    """Sets the executor shared by every port for blocking calls."""
+    global _executor
+    _executor = executor
+
+
+def get_executor():
+    """Gets the executor shared by every port for blocking calls."""
+    global _executor
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=min(32, (os.cpu_count() or 1) + 4),
+            thread_name_prefix='fscc')
+
+    return _executor
+
+
+class Port(object):
+    """Commtech FSCC port for use with asyncio.
+
+    On Linux reads wait for the port's file descriptor to become readable on
+    the event loop, so waiting ports don't use any threads. Everything else
+    (and reads on Windows) runs on an executor shared by every port.
+    """
+    _own_attributes = ('port', '_read_lock', '_fd')
+
+    def __init__(self, port, append_status=True, append_timestamp=True):
+        if not isinstance(port, fscc.port.Port):
+            port = fscc.port.Port(port, append_status, append_timestamp)
+
+        self.port = port
+        self._read_lock = asyncio.Lock()
+
+        try:
+            self._fd = port.fileno()
+        except io.UnsupportedOperation:
+            self._fd = None
+
+    def __getattr__(self, name):
+        return getattr(self.__dict__['port'], name)
+
+    def __setattr__(self, name, value):
+        if name in self._own_attributes:
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.port, name, value)
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_executor(), func, *args)
+
+    async def _wait_readable(self, timeout):
+        loop = asyncio.get_running_loop()
+        readable = loop.create_future()
+
+        def on_readable():
+            if not readable.done():
+                readable.set_result(None)
+
+        loop.add_reader(self._fd, on_readable)
+
+        try:
+            await asyncio.wait_for(readable, timeout)
+        finally:
+            loop.remove_reader(self._fd)
+
+    async def _read_when_ready(self, read, timeout, is_empty):
+        """Calls read(timeout) once the port has data waiting."""
+        if self._fd is None:
+            return await self._run(read, timeout)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout / 1000 if timeout else None
+
+        async with self._read_lock:
+            while True:
+                remaining = None
+
+                if deadline is not None:
+                    remaining = max(deadline - loop.time(), 0)
+
+                try:
+                    await self._wait_readable(remaining)
+                except asyncio.TimeoutError:
+                    pass
+
+                # Any data is already waiting, the short timeout only guards
+                # against a spurious wake up blocking the event loop.
+                result = read(1)
+
+                if deadline is None and is_empty(result):
+                    continue
+
+                return result
+
+    async def read(self, timeout=None, size=4096):
+        """Reads data from the card."""
+        return await self._read_when_ready(
+            lambda t: self.port.read(t, size), timeout,
+            lambda frame: frame[0] is None)
+
+    async def read_frames(self, max_bytes=65536, timeout=None,
+                          frame_size=None):
+        """Reads a batch of frames from the card."""
+        return await self._read_when_ready(
+            lambda t: self.port.read_frames(max_bytes, t, frame_size),
+            timeout, lambda batch: not len(batch))
+
+    async def write(self, data):
+        """Writes data to the card."""
+        return await self._run(self.port.write, data)
+
+    async def track_interrupts(self, interrupts, timeout=None):
+        """Tracks interrupts.
+
+        This waits on the shared executor, so each call that is waiting uses
+        one of its threads.
+        """
+        return await self._run(self.port.track_interrupts, interrupts,
+                               timeout)
+
+    def close(self):
+        self.port.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            frame = await self.read()
+
+            if frame[0] is not None:
+                return frame
+
+    def __str__(self):
+        return str(self.port)
+
+    def __repr__(self):
+        return 'fscc.aio.Port({!r})'.format(self.port)
+
+
+AsyncPort = Port
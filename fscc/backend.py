@@ -0,0 +1,413 @@
+"""
+    MIT License
+
+Copyright (c) [2019] [Commtech]
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import ctypes
+import errno
+import io
+import os
+import select
+import threading
+from array import array
+
+from fscc import clock
+from fscc.errors import *
+
+if os.name == 'nt':
+    FSCC_HANDLE = ctypes.c_void_p
+else:
+    FSCC_HANDLE = ctypes.c_int
+
+
+class FsccMemoryCap(ctypes.Structure):
+    _fields_ = [
+        ('input', ctypes.c_int),
+        ('output', ctypes.c_int),
+    ]
+
+
+FsccRegisters = ctypes.c_int64 * 24
+
+SETTINGS = ('append_status', 'append_timestamp', 'ignore_timeout',
+            'rx_multiple', 'tx_modifiers')
+
+
+class CfsccBackend(object):
+    """Talks to the driver through the cfscc library."""
+    name = 'cfscc'
+
+    class Handle(object):
+        """A connection to a port."""
+
+        def __init__(self, port_num, handle):
+            self.port_num = port_num
+            self.arg = handle
+
+    def __init__(self, cfscc=None):
+        if cfscc is None:
+            from fscc import cfscc
+
+        self.cfscc = cfscc
+
+        # The calls made for every frame are looked up once
+        self._read_with_blocking = cfscc.unchecked_fscc_read_with_blocking
+        self._read_with_timeout = cfscc.unchecked_fscc_read_with_timeout
+        self._write_with_blocking = cfscc.unchecked_fscc_write_with_blocking
+
+        # The out values of reads and writes are made once per thread, as a
+        # handle is shared by threads
+        self._local = threading.local()
+
+    def _out(self, name):
+        """Makes this thread's out value for a call and a reference to it."""
+        value = ctypes.c_uint()
+        out = (value, ctypes.byref(value))
+        setattr(self._local, name, out)
+        return out
+
+    def connect(self, port_num):
+        handle = FSCC_HANDLE()
+        check_error(self.cfscc.fscc_connect(port_num, ctypes.byref(handle)))
+        return CfsccBackend.Handle(port_num, handle)
+
+    def disconnect(self, handle):
+        check_error(self.cfscc.fscc_disconnect(handle.arg))
+
+    def fileno(self, handle):
+        if os.name == 'nt':
+            raise io.UnsupportedOperation('fileno')
+
+        return handle.arg.value
+
+    def get_setting(self, handle, name):
+        # Each call gets its own out value, a handle is shared by threads
+        value = ctypes.c_uint()
+        func = getattr(self.cfscc, 'fscc_get_{}'.format(name))
+        check_error(func(handle.arg, ctypes.byref(value)))
+        return value.value
+
+    def set_setting(self, handle, name, value):
+        if name == 'tx_modifiers':
+            e = self.cfscc.fscc_set_tx_modifiers(handle.arg, int(value))
+        elif value:
+            e = getattr(self.cfscc, 'fscc_enable_{}'.format(name))(handle.arg)
+        else:
+            e = getattr(self.cfscc, 'fscc_disable_{}'.format(name))(
+                handle.arg)
+
+        check_error(e)
+
+    def get_memory_cap(self, handle, memcap):
+        check_error(self.cfscc.fscc_get_memory_cap(handle.arg, memcap))
+
+    def set_memory_cap(self, handle, memcap):
+        check_error(self.cfscc.fscc_set_memory_cap(handle.arg, memcap))
+
+    def get_registers(self, handle, registers):
+        check_error(self.cfscc.unchecked_fscc_get_registers(handle.arg,
+                                                            registers))
+
+    def set_registers(self, handle, registers):
+        check_error(self.cfscc.unchecked_fscc_set_registers(handle.arg,
+                                                            registers))
+
+    def set_clock_frequency(self, handle, frequency):
+        check_error(self.cfscc.fscc_set_clock_frequency(handle.arg,
+                                                        int(frequency)))
+
+    def purge(self, handle, tx, rx):
+        check_error(self.cfscc.fscc_purge(handle.arg, bool(tx), bool(rx)))
+
+    def track_interrupts(self, handle, interrupts, timeout=None):
+        value = ctypes.c_uint()
+
+        if timeout:
+            e = self.cfscc.fscc_track_interrupts_with_timeout(
+                handle.arg, interrupts, ctypes.byref(value), int(timeout))
+        else:
+            e = self.cfscc.fscc_track_interrupts_with_blocking(
+                handle.arg, interrupts, ctypes.byref(value))
+
+        check_error(e)
+
+        return value.value
+
+    def buffer(self, view):
+        """Gets a buffer that can be passed to read() for a memoryview."""
+        return (ctypes.c_char * len(view)).from_buffer(view)
+
+    def read(self, handle, buf, size, timeout=None):
+        try:
+            bytes_read, out = self._local.read
+        except AttributeError:
+            bytes_read, out = self._out('read')
+
+        if timeout:
+            e = self._read_with_timeout(handle.arg, buf, size, out,
+                                        int(timeout))
+        else:
+            e = self._read_with_blocking(handle.arg, buf, size, out)
+
+        check_error(e)
+
+        return bytes_read.value
+
+    def write(self, handle, data):
+        if isinstance(data, bytes):
+            size = len(data)
+        else:
+            view = memoryview(data).cast('B')
+            size = len(view)
+
+            if view.readonly:
+                data = view.tobytes()
+            else:
+                data = (ctypes.c_char * size).from_buffer(view)
+
+        try:
+            bytes_written, out = self._local.write
+        except AttributeError:
+            bytes_written, out = self._out('write')
+
+        e = self._write_with_blocking(handle.arg, data, size, out)
+        check_error(e)
+
+        return bytes_written.value
+
+
+def _ioc(direction, number, size):
+    return (direction << 30) | (size << 16) | (0x18 << 8) | number
+
+
+def _io(number):
+    return _ioc(0, number, 0)
+
+
+def _ior(number, size=ctypes.sizeof(ctypes.c_void_p)):
+    return _ioc(2, number, size)
+
+
+def _iow(number, size=ctypes.sizeof(ctypes.c_void_p)):
+    return _ioc(1, number, size)
+
+
+def _iowr(number, size=ctypes.sizeof(ctypes.c_void_p)):
+    return _ioc(3, number, size)
+
+
+class LinuxBackend(object):
+    """Talks to the fscc-linux driver through /dev/fscc* directly.
+
+    This doesn't need the cfscc library. The clock generator's dividers are
+    worked out in fscc.clock and sent with FSCC_SET_CLOCK_BITS.
+    """
+    name = 'linux'
+
+    # Requests from the fscc-linux driver's fscc.h
+    FSCC_GET_REGISTERS = _iowr(0)
+    FSCC_SET_REGISTERS = _iow(1)
+    FSCC_PURGE_TX = _io(2)
+    FSCC_PURGE_RX = _io(3)
+    FSCC_ENABLE_APPEND_STATUS = _io(4)
+    FSCC_DISABLE_APPEND_STATUS = _io(5)
+    FSCC_SET_MEMORY_CAP = _iow(6)
+    FSCC_GET_MEMORY_CAP = _ior(7)
+    FSCC_SET_CLOCK_BITS = _iow(8, clock.CLOCK_BITS_SIZE)
+    FSCC_ENABLE_IGNORE_TIMEOUT = _io(10)
+    FSCC_DISABLE_IGNORE_TIMEOUT = _io(11)
+    FSCC_SET_TX_MODIFIERS = _iow(12, ctypes.sizeof(ctypes.c_uint))
+    FSCC_GET_TX_MODIFIERS = _ior(14)
+    FSCC_GET_APPEND_STATUS = _ior(13)
+    FSCC_GET_IGNORE_TIMEOUT = _ior(15)
+    FSCC_ENABLE_RX_MULTIPLE = _io(16)
+    FSCC_DISABLE_RX_MULTIPLE = _io(17)
+    FSCC_GET_RX_MULTIPLE = _ior(18)
+    FSCC_ENABLE_APPEND_TIMESTAMP = _io(19)
+    FSCC_DISABLE_APPEND_TIMESTAMP = _io(20)
+    FSCC_GET_APPEND_TIMESTAMP = _ior(21)
+
+    errors = {
+        errno.ENOENT: PortNotFoundError,
+        errno.ENODEV: PortNotFoundError,
+        errno.EACCES: InvalidAccessError,
+        errno.EPERM: InvalidAccessError,
+        errno.ETIMEDOUT: TimeoutError,
+        errno.ENOBUFS: BufferTooSmallError,
+        errno.EOPNOTSUPP: IncorrectModeError,
+        errno.EINVAL: InvalidParameterError,
+    }
+
+    class Handle(object):
+        """A connection to a port."""
+
+        def __init__(self, port_num, fd):
+            self.port_num = port_num
+            self.fd = fd
+            self.poll = select.poll()
+            self.poll.register(fd, select.POLLIN)
+
+    def __init__(self, device_path='/dev/fscc{}'):
+        import fcntl
+
+        self.ioctl = fcntl.ioctl
+        self.device_path = device_path
+
+    def _call(self, func, *args):
+        try:
+            return func(*args)
+        except OSError as e:
+            if e.errno in self.errors:
+                raise self.errors[e.errno]() from e
+            raise
+
+    def _ioctl(self, handle, request, arg=0, mutate=False):
+        return self._call(self.ioctl, handle.fd, request, arg, mutate)
+
+    def connect(self, port_num):
+        try:
+            fd = os.open(self.device_path.format(port_num), os.O_RDWR)
+        except OSError as e:
+            if e.errno in (errno.ENOENT, errno.ENODEV):
+                raise PortNotFoundError(port_num) from e
+            elif e.errno in (errno.EACCES, errno.EPERM):
+                raise InvalidAccessError() from e
+            raise
+
+        return LinuxBackend.Handle(port_num, fd)
+
+    def disconnect(self, handle):
+        os.close(handle.fd)
+
+    def fileno(self, handle):
+        return handle.fd
+
+    def get_setting(self, handle, name):
+        request = getattr(self, 'FSCC_GET_{}'.format(name.upper()))
+        value = array('I', [0])
+        self._ioctl(handle, request, value, True)
+        return value[0]
+
+    def set_setting(self, handle, name, value):
+        if name == 'tx_modifiers':
+            self._ioctl(handle, self.FSCC_SET_TX_MODIFIERS, int(value))
+        elif value:
+            self._ioctl(handle, getattr(self, 'FSCC_ENABLE_{}'.format(
+                name.upper())))
+        else:
+            self._ioctl(handle, getattr(self, 'FSCC_DISABLE_{}'.format(
+                name.upper())))
+
+    def get_memory_cap(self, handle, memcap):
+        self._ioctl(handle, self.FSCC_GET_MEMORY_CAP, memcap, True)
+
+    def set_memory_cap(self, handle, memcap):
+        self._ioctl(handle, self.FSCC_SET_MEMORY_CAP, memcap)
+
+    def get_registers(self, handle, registers):
+        self._ioctl(handle, self.FSCC_GET_REGISTERS, registers, True)
+
+    def set_registers(self, handle, registers):
+        self._ioctl(handle, self.FSCC_SET_REGISTERS, registers)
+
+    def set_clock_frequency(self, handle, frequency):
+        bits = bytearray(clock.clock_bits(frequency))
+        self._ioctl(handle, self.FSCC_SET_CLOCK_BITS, bits)
+
+    def purge(self, handle, tx, rx):
+        if tx:
+            self._ioctl(handle, self.FSCC_PURGE_TX)
+
+        if rx:
+            self._ioctl(handle, self.FSCC_PURGE_RX)
+
+    def track_interrupts(self, handle, interrupts, timeout=None):
+        raise OSError(errno.EOPNOTSUPP,
+                      'Tracking interrupts is not supported on Linux')
+
+    def buffer(self, view):
+        """Gets a buffer that can be passed to read() for a memoryview."""
+        return view
+
+    def read(self, handle, buf, size, timeout=None):
+        if timeout and not handle.poll.poll(int(timeout)):
+            return 0
+
+        if size < len(buf):
+            buf = buf[:size]
+
+        return self._call(os.readv, handle.fd, [buf])
+
+    def write(self, handle, data):
+        return self._call(os.write, handle.fd, data)
+
+
+def _sim_backend():
+    from fscc.sim import shared_backend
+    return shared_backend()
+
+
+backends = {
+    'cfscc': CfsccBackend,
+    'linux': LinuxBackend,
+    'sim': _sim_backend,
+}
+
+_default_backend = None
+
+
+def register_backend(name, factory):
+    """Makes a backend available by name."""
+    backends[name] = factory
+
+
+def get_backend(backend=None):
+    """Gets a backend by name, or the default backend.
+
+    The default is the backend named by the FSCC_BACKEND environment variable
+    if it is set. Otherwise it is cfscc, or on Linux the direct backend if the
+    cfscc library can't be loaded.
+    """
+    global _default_backend
+
+    if backend is not None and not isinstance(backend, str):
+        return backend
+
+    if backend is not None:
+        return backends[backend]()
+
+    if _default_backend is None:
+        name = os.environ.get('FSCC_BACKEND')
+
+        if name:
+            _default_backend = backends[name]()
+        else:
+            try:
+                _default_backend = CfsccBackend()
+            except OSError:
+                if os.name == 'nt':
+                    raise
+
+                _default_backend = LinuxBackend()
+
+    return _default_backend
@@ -0,0 +1,481 @@
+"""
+    MIT License
+
+Copyright (c) [2019] [Commtech]
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import bisect
+import collections
+import itertools
+import mmap
+import os
+import struct
+from array import array
+
+from fscc.frame import status_word, timestamp_ns
+
+# A capture file is a header followed by one record per frame. Each record is
+# a fixed size header followed by the frame data, padded to 8 bytes.
+MAGIC = b'FSCCCAP1'
+INDEX_MAGIC = b'FSCCIDX1'
+FILE_HEADER = struct.Struct('<8sII')
+VERSION = 1
+
+# Data length, port number, flags, status and timestamp in nanoseconds
+RECORD_HEADER = struct.Struct('<IBBHq')
+
+# Record offset, timestamp in nanoseconds, data length, status, port number
+# and flags of each record in the sidecar index
+INDEX_ENTRY = struct.Struct('<QqIHBB')
+
+HAS_STATUS = 0x1
+HAS_TIMESTAMP = 0x2
+
+# Offset and format of each index entry field
+INDEX_FIELDS = {
+    'offsets': (0, 'Q'),
+    'timestamps': (8, 'q'),
+    'lengths': (16, 'I'),
+    'statuses': (20, 'H'),
+    'ports': (22, 'B'),
+    'flags': (23, 'B'),
+}
+
+Record = collections.namedtuple('Record', 'port data status timestamp')
+
+
+def index_path(path):
+    """Gets the path of the sidecar index of a capture file."""
+    return path + '.idx'
+
+
+def _check_header(path, magic):
+    with open(path, 'rb') as f:
+        header = f.read(FILE_HEADER.size)
+
+    if len(header) < FILE_HEADER.size or \
+            FILE_HEADER.unpack(header)[:2] != (magic, VERSION):
+        raise ValueError('{} is not a version {} capture'.format(path,
+                                                                VERSION))
+
+
+def _padded(size):
+    return (size + 7) & ~7
+
+
+def _write_all(file, data):
+    """Writes all of data to an unbuffered file, which can write less than
+    it was given.
+    """
+    with memoryview(data) as view:
+        written = 0
+
+        while written < len(view):
+            with view[written:] as rest:
+                written += file.write(rest)
+
+
+def _scan(buffer, offset):
+    """Builds the index entries of the whole records in a capture from offset
+    on.
+
+    Returns the entries and the offset the last whole record ends at.
+    """
+    entries = bytearray()
+
+    while offset + RECORD_HEADER.size <= len(buffer):
+        length, port, flags, status, timestamp = \
+            RECORD_HEADER.unpack_from(buffer, offset)
+
+        if offset + RECORD_HEADER.size + length > len(buffer):
+            break
+
+        entries += INDEX_ENTRY.pack(offset, timestamp, length, status, port,
+                                    flags)
+        offset += _padded(RECORD_HEADER.size + length)
+
+    return entries, offset
+
+
+class Recorder(object):
+    """Appends frames to a capture file and its sidecar index.
+
+    Records are assembled in a large buffer and written with a single call
+    once it fills, and read_from() reads frames from a port straight into
+    that buffer. The index is only written after the records it points to,
+    so it never points past the end of the capture. Reopening a capture that
+    wasn't closed indexes the records that were written without their index
+    entries, and drops a record or entry that was only partly written.
+    """
+
+    def __init__(self, path, buffer_size=4194304):
+        self.path = path
+        self.frames = 0
+        self.bytes = 0
+
+        self._file = open(path, 'ab', buffering=0)
+        self._index = open(index_path(path), 'ab', buffering=0)
+
+        self._offset = self._file.seek(0, os.SEEK_END)
+
+        if self._offset:
+            _check_header(path, MAGIC)
+        else:
+            _write_all(self._file,
+                       FILE_HEADER.pack(MAGIC, VERSION, FILE_HEADER.size))
+            self._offset = FILE_HEADER.size
+
+        if self._index.seek(0, os.SEEK_END):
+            _check_header(index_path(path), INDEX_MAGIC)
+        else:
+            _write_all(self._index, FILE_HEADER.pack(INDEX_MAGIC, VERSION,
+                                                     FILE_HEADER.size))
+
+        self._recover()
+
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._used = 0
+        self._entries = bytearray()
+
+    def _recover(self):
+        """Brings the index up to date with the capture after a crash."""
+        size = self._index.seek(0, os.SEEK_END)
+        count = (size - FILE_HEADER.size) // INDEX_ENTRY.size
+        indexed = FILE_HEADER.size + count * INDEX_ENTRY.size
+        end = FILE_HEADER.size
+
+        if indexed != size:
+            self._index.truncate(indexed)
+
+        if count:
+            with open(index_path(self.path), 'rb') as f:
+                f.seek(indexed - INDEX_ENTRY.size)
+                offset, _, length = INDEX_ENTRY.unpack(
+                    f.read(INDEX_ENTRY.size))[:3]
+
+            end = offset + _padded(RECORD_HEADER.size + length)
+
+        if end >= self._offset:
+            return
+
+        with open(self.path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            entries, end = _scan(buffer, end)
+
+        _write_all(self._index, entries)
+
+        if end < self._offset:
+            self._file.truncate(end)
+            self._offset = end
+
+    def _reserve(self, size):
+        """Makes room in the buffer for a record of size bytes."""
+        needed = _padded(RECORD_HEADER.size + size)
+
+        if self._used + needed > len(self._buffer):
+            self.flush()
+
+            if needed > len(self._buffer):
+                self._buffer = bytearray(needed)
+                self._view = memoryview(self._buffer)
+
+        return self._used
+
+    def _commit(self, position, length, port, status, timestamp):
+        """Finishes the record that was put at position in the buffer."""
+        flags = 0
+
+        if status is None:
+            status = 0
+        else:
+            flags |= HAS_STATUS
+            status = status_word(status)
+
+        if timestamp is None:
+            timestamp = 0
+        else:
+            flags |= HAS_TIMESTAMP
+            timestamp = timestamp_ns(timestamp)
+
+        self._append(position, length, port, flags, status, timestamp)
+
+    def _append(self, position, length, port, flags, status, timestamp):
+        """Writes the header and index entry of the record at position."""
+        RECORD_HEADER.pack_into(self._buffer, position, length, port, flags,
+                                status, timestamp)
+        self._entries += INDEX_ENTRY.pack(self._offset + position, timestamp,
+                                          length, status, port, flags)
+
+        self._used = position + _padded(RECORD_HEADER.size + length)
+        self.frames += 1
+        self.bytes += length
+
+    def write(self, data, status=None, timestamp=None, port=0):
+        """Records a frame.
+
+        The status is the appended status bytes and the timestamp can be the
+        appended timestamp bytes, seconds (as returned by read()) or
+        nanoseconds since the epoch.
+        """
+        if not isinstance(data, bytes):
+            data = memoryview(data).cast('B')
+
+        position = self._reserve(len(data))
+        start = position + RECORD_HEADER.size
+
+        self._buffer[start:start + len(data)] = data
+        self._commit(position, len(data), port, status, timestamp)
+
+    def write_batch(self, batch, port=0):
+        """Records every frame of a FrameBatch.
+
+        The status and timestamp of each frame come from the batch's integer
+        columns, so the timestamps are recorded to the nanosecond.
+        """
+        statuses, timestamps = batch.statuses, batch.timestamps
+        flags = 0
+
+        if statuses is None:
+            statuses = itertools.repeat(0)
+        else:
+            flags |= HAS_STATUS
+
+        if timestamps is None:
+            timestamps = itertools.repeat(0)
+        else:
+            flags |= HAS_TIMESTAMP
+
+        for data, status, timestamp in zip(batch.views(), statuses,
+                                           timestamps):
+            length = len(data)
+            position = self._reserve(length)
+            start = position + RECORD_HEADER.size
+
+            self._buffer[start:start + length] = data
+            self._append(position, length, port, flags, status, timestamp)
+
+    def read_from(self, port, timeout=None, size=4096):
+        """Reads a frame from a port straight into the capture.
+
+        Returns the number of bytes read, which is 0 on a timeout.
+        """
+        position = self._reserve(size)
+        start = position + RECORD_HEADER.size
+
+        bytes_read, data, status, timestamp = port.readinto(
+            self._view[start:start + size], timeout)
+
+        if bytes_read:
+            self._commit(position, len(data), port._port_num, status,
+                         timestamp)
+
+        return bytes_read
+
+    def flush(self):
+        """Writes the buffered records to the capture and index."""
+        if self._used:
+            _write_all(self._file, self._view[:self._used])
+            self._offset += self._used
+            self._used = 0
+
+        if self._entries:
+            _write_all(self._index, self._entries)
+            self._entries = bytearray()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return '<fscc.capture.Recorder {!r} frames={}>'.format(self.path,
+                                                             self.frames)
+
+
+class Column(object):
+    """One field of every index entry, read in place from the index.
+
+    numpy() gets a NumPy array that shares the index's memory, so whole
+    captures can be analysed without copying anything.
+    """
+
+    def __init__(self, buffer, name, count):
+        offset, self._format = INDEX_FIELDS[name]
+
+        self.name = name
+        self._buffer = buffer
+        self._field = list(INDEX_FIELDS).index(name)
+        self._offset = FILE_HEADER.size + offset
+        self._struct = struct.Struct('<' + self._format)
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return array(self._format,
+                         [self[i] for i in range(*index.indices(len(self)))])
+
+        if index < 0:
+            index += self._count
+
+        if not 0 <= index < self._count:
+            raise IndexError('index out of range')
+
+        return self._struct.unpack_from(
+            self._buffer, self._offset + index * INDEX_ENTRY.size)[0]
+
+    def __iter__(self):
+        field = self._field
+        end = FILE_HEADER.size + self._count * INDEX_ENTRY.size
+
+        with memoryview(self._buffer) as view:
+            for entry in INDEX_ENTRY.iter_unpack(view[FILE_HEADER.size:end]):
+                yield entry[field]
+
+    def array(self):
+        """Copies the column into an array."""
+        return array(self._format, self)
+
+    def numpy(self):
+        """Gets the column as a NumPy array without copying it."""
+        import numpy
+
+        return numpy.ndarray((self._count,), '<' + self._format,
+                             self._buffer, self._offset,
+                             (INDEX_ENTRY.size,))
+
+    def __repr__(self):
+        return '<fscc.capture.Column {} entries={}>'.format(self.name,
+                                                          self._count)
+
+
+class Reader(object):
+    """Reads a capture file through a memory map.
+
+    Frames are found through the sidecar index, so any frame can be read
+    without reading the ones before it. If the index is missing or doesn't
+    cover the whole capture (the recorder stopped before flushing it) the
+    rest is rebuilt in memory by scanning the capture.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        _check_header(path, MAGIC)
+
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._index_map = None
+        index = None
+
+        try:
+            with open(index_path(path), 'rb') as f:
+                self._index_map = mmap.mmap(f.fileno(), 0,
+                                            access=mmap.ACCESS_READ)
+                index = self._index_map
+        except FileNotFoundError:
+            pass
+
+        if index is None or index[:8] != INDEX_MAGIC:
+            index = FILE_HEADER.pack(INDEX_MAGIC, VERSION, FILE_HEADER.size)
+
+        count = (len(index) - FILE_HEADER.size) // INDEX_ENTRY.size
+        end = FILE_HEADER.size
+
+        if count:
+            offset, _, length = INDEX_ENTRY.unpack_from(
+                index, FILE_HEADER.size + (count - 1) * INDEX_ENTRY.size)[:3]
+            end = offset + _padded(RECORD_HEADER.size + length)
+
+        if end < len(self._map):
+            entries = _scan(self._map, end)[0]
+            index = bytes(index[:FILE_HEADER.size + count * INDEX_ENTRY.size])
+            index += entries
+            count += len(entries) // INDEX_ENTRY.size
+
+        self._index = index
+        self._count = count
+
+        for name in INDEX_FIELDS:
+            setattr(self, name, Column(index, name, count))
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        """Gets frame i, with its data as a view of the capture."""
+        if index < 0:
+            index += self._count
+
+        if not 0 <= index < self._count:
+            raise IndexError('frame index out of range')
+
+        offset, timestamp, length, status, port, flags = \
+            INDEX_ENTRY.unpack_from(self._index, FILE_HEADER.size +
+                                    index * INDEX_ENTRY.size)
+        start = offset + RECORD_HEADER.size
+
+        return Record(port, memoryview(self._map)[start:start + length],
+                      status if flags & HAS_STATUS else None,
+                      timestamp if flags & HAS_TIMESTAMP else None)
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+    def find(self, timestamp):
+        """Gets the index of the first frame at or after a timestamp, in
+        seconds or nanoseconds since the epoch.
+
+        The frames have to have been recorded in timestamp order.
+        """
+        return bisect.bisect_left(self.timestamps, timestamp_ns(timestamp))
+
+    def close(self):
+        """Closes the capture, once any views of frame data are released."""
+        for m in (self._map, self._index_map):
+            try:
+                if m is not None:
+                    m.close()
+            except BufferError:
+                # Closed when the last view of it goes away
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return '<fscc.capture.Reader {!r} frames={}>'.format(self.path,
+                                                           self._count)
+
@@ -0,0 +1,169 @@
+"""
+    MIT License
+
+Copyright (c) [2019] [Commtech]
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import ctypes
+import os
+import sys
+
+from fscc.backend import FSCC_HANDLE, FsccMemoryCap, FsccRegisters
+
+if os.name == 'nt':
+    DLL_NAME = 'cfscc.dll'
+else:
+    if ctypes.sizeof(ctypes.c_voidp) == 4:
+        DLL_NAME = 'libcfscc.so'
+    else:
+        DLL_NAME = 'libcfscc.so.6'
+
+try:
+    lib = ctypes.cdll.LoadLibrary(DLL_NAME)
+except:
+    if os.name == 'nt':
+        lib = ctypes.cdll.LoadLibrary(os.path.join(sys.prefix, 'DLLS',
+                                                   DLL_NAME))
+    else:
+        lib = ctypes.cdll.LoadLibrary(os.path.join(sys.prefix, 'local', 'DLLs',
+                                                   DLL_NAME))
+
+_unsigned = ctypes.c_uint
+_unsigned_p = ctypes.POINTER(ctypes.c_uint)
+
+# Return type and arguments of every function in cfscc.h. The overlapped
+# functions (fscc_read, fscc_write and fscc_track_interrupts) aren't bound
+# below since Port only makes blocking and timeout calls, _bind() binds them.
+prototypes = {
+    'fscc_connect': (ctypes.c_int, [_unsigned, ctypes.POINTER(FSCC_HANDLE)]),
+    'fscc_disconnect': (ctypes.c_int, [FSCC_HANDLE]),
+
+    'fscc_set_tx_modifiers': (ctypes.c_int, [FSCC_HANDLE, _unsigned]),
+    'fscc_get_tx_modifiers': (ctypes.c_int, [FSCC_HANDLE, _unsigned_p]),
+
+    'fscc_set_memory_cap': (ctypes.c_int, [FSCC_HANDLE,
+                                           ctypes.POINTER(FsccMemoryCap)]),
+    'fscc_get_memory_cap': (ctypes.c_int, [FSCC_HANDLE,
+                                           ctypes.POINTER(FsccMemoryCap)]),
+
+    'fscc_set_registers': (ctypes.c_int, [FSCC_HANDLE,
+                                          ctypes.POINTER(FsccRegisters)]),
+    'fscc_get_registers': (ctypes.c_int, [FSCC_HANDLE,
+                                          ctypes.POINTER(FsccRegisters)]),
+
+    'fscc_get_append_status': (ctypes.c_int, [FSCC_HANDLE, _unsigned_p]),
+    'fscc_enable_append_status': (ctypes.c_int, [FSCC_HANDLE]),
+    'fscc_disable_append_status': (ctypes.c_int, [FSCC_HANDLE]),
+
+    'fscc_get_append_timestamp': (ctypes.c_int, [FSCC_HANDLE, _unsigned_p]),
+    'fscc_enable_append_timestamp': (ctypes.c_int, [FSCC_HANDLE]),
+    'fscc_disable_append_timestamp': (ctypes.c_int, [FSCC_HANDLE]),
+
+    'fscc_get_ignore_timeout': (ctypes.c_int, [FSCC_HANDLE, _unsigned_p]),
+    'fscc_enable_ignore_timeout': (ctypes.c_int, [FSCC_HANDLE]),
+    'fscc_disable_ignore_timeout': (ctypes.c_int, [FSCC_HANDLE]),
+
+    'fscc_get_rx_multiple': (ctypes.c_int, [FSCC_HANDLE, _unsigned_p]),
+    'fscc_enable_rx_multiple': (ctypes.c_int, [FSCC_HANDLE]),
+    'fscc_disable_rx_multiple': (ctypes.c_int, [FSCC_HANDLE]),
+
+    'fscc_track_interrupts_with_blocking': (ctypes.c_int, [
+        FSCC_HANDLE, _unsigned, _unsigned_p]),
+    'fscc_track_interrupts_with_timeout': (ctypes.c_int, [
+        FSCC_HANDLE, _unsigned, _unsigned_p, _unsigned]),
+
+    'fscc_track_interrupts': (ctypes.c_int, [
+        FSCC_HANDLE, _unsigned, _unsigned_p, ctypes.c_void_p]),
+
+    'fscc_purge': (ctypes.c_int, [FSCC_HANDLE, _unsigned, _unsigned]),
+
+    'fscc_write': (ctypes.c_int, [
+        FSCC_HANDLE, ctypes.c_char_p, _unsigned, _unsigned_p,
+        ctypes.c_void_p]),
+    'fscc_read': (ctypes.c_int, [
+        FSCC_HANDLE, ctypes.POINTER(ctypes.c_char), _unsigned, _unsigned_p,
+        ctypes.c_void_p]),
+
+    'fscc_write_with_blocking': (ctypes.c_int, [
+        FSCC_HANDLE, ctypes.c_char_p, _unsigned, _unsigned_p]),
+    'fscc_read_with_blocking': (ctypes.c_int, [
+        FSCC_HANDLE, ctypes.POINTER(ctypes.c_char), _unsigned, _unsigned_p]),
+    'fscc_read_with_timeout': (ctypes.c_int, [
+        FSCC_HANDLE, ctypes.POINTER(ctypes.c_char), _unsigned, _unsigned_p,
+        _unsigned]),
+
+    'fscc_set_clock_frequency': (ctypes.c_int, [FSCC_HANDLE, _unsigned]),
+}
+
+
+def _bind(name, checked=True):
+    """Binds a function from the library with its prototype.
+
+    Unchecked functions only have their return type set. ctypes' argument
+    conversion costs more than the call itself, so the calls made for every
+    frame use these and pass arguments that already have the exact types from
+    the prototype.
+    """
+    func = lib[name]
+    func.restype, argtypes = prototypes[name]
+
+    if checked:
+        func.argtypes = argtypes
+
+    return func
+
+
+fscc_connect = _bind('fscc_connect')
+fscc_disconnect = _bind('fscc_disconnect')
+fscc_set_tx_modifiers = _bind('fscc_set_tx_modifiers')
+fscc_get_tx_modifiers = _bind('fscc_get_tx_modifiers')
+fscc_set_memory_cap = _bind('fscc_set_memory_cap')
+fscc_get_memory_cap = _bind('fscc_get_memory_cap')
+fscc_set_registers = _bind('fscc_set_registers')
+fscc_get_registers = _bind('fscc_get_registers')
+fscc_get_append_status = _bind('fscc_get_append_status')
+fscc_enable_append_status = _bind('fscc_enable_append_status')
+fscc_disable_append_status = _bind('fscc_disable_append_status')
+fscc_get_append_timestamp = _bind('fscc_get_append_timestamp')
+fscc_enable_append_timestamp = _bind('fscc_enable_append_timestamp')
+fscc_disable_append_timestamp = _bind('fscc_disable_append_timestamp')
+fscc_get_ignore_timeout = _bind('fscc_get_ignore_timeout')
+fscc_enable_ignore_timeout = _bind('fscc_enable_ignore_timeout')
+fscc_disable_ignore_timeout = _bind('fscc_disable_ignore_timeout')
+fscc_get_rx_multiple = _bind('fscc_get_rx_multiple')
+fscc_enable_rx_multiple = _bind('fscc_enable_rx_multiple')
+fscc_disable_rx_multiple = _bind('fscc_disable_rx_multiple')
+fscc_track_interrupts_with_blocking = _bind(
+    'fscc_track_interrupts_with_blocking')
+fscc_track_interrupts_with_timeout = _bind(
+    'fscc_track_interrupts_with_timeout')
+fscc_purge = _bind('fscc_purge')
+fscc_write_with_blocking = _bind('fscc_write_with_blocking')
+fscc_read_with_blocking = _bind('fscc_read_with_blocking')
+fscc_read_with_timeout = _bind('fscc_read_with_timeout')
+fscc_set_clock_frequency = _bind('fscc_set_clock_frequency')
+
+unchecked_fscc_write_with_blocking = _bind('fscc_write_with_blocking', False)
+unchecked_fscc_read_with_blocking = _bind('fscc_read_with_blocking', False)
+unchecked_fscc_read_with_timeout = _bind('fscc_read_with_timeout', False)
+unchecked_fscc_set_registers = _bind('fscc_set_registers', False)
+unchecked_fscc_get_registers = _bind('fscc_get_registers', False)
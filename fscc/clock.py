@@ -0,0 +1,121 @@
+"""
+    MIT License
+
+Copyright (c) [2019] [Commtech]
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import collections
+import math
+
+from fscc.errors import InvalidParameterError
+
+# Works out the dividers of the clock generator on a port and the bits that
+# program it, for backends that talk to the driver without cfscc.
+
+# The clock generator (an ICS30703) runs from an 18.432 MHz reference
+REFERENCE_FREQUENCY = 18432000
+
+# The frequencies cfscc accepts and how close (in parts per million) it gets
+MIN_FREQUENCY = 15000
+MAX_FREQUENCY = 270000000
+PPM = 10
+
+VCO_MIN = 100000000
+VCO_MAX = 400000000
+
+REFERENCE_DIVIDERS = range(1, 1 << 7)
+VCO_DIVIDERS = range(12, 1 << 11)
+OUTPUT_DIVIDERS = range(1, 1 << 15)
+
+# The programming word is sent to the driver as little endian bytes, with
+# the reference, VCO and output dividers packed from the lowest bit up
+CLOCK_BITS_SIZE = 20
+VCO_SHIFT = 7
+OUTPUT_SHIFT = 18
+
+ClockSettings = collections.namedtuple(
+    'ClockSettings', 'reference_divider vco_divider output_divider')
+
+
+def frequency(settings):
+    """Gets the output frequency of a set of dividers."""
+    return REFERENCE_FREQUENCY * 2 * settings.vco_divider / (
+        settings.reference_divider * settings.output_divider)
+
+
+def calculate(target, ppm=PPM):
+    """Finds the dividers that give a frequency within ppm of the target.
+
+    The lowest output divider (so the lowest VCO frequency) is used, with the
+    lowest reference divider that reaches the target. If no dividers are
+    that close the closest ones are used. Raises InvalidParameterError if the
+    target is out of range.
+    """
+    if not MIN_FREQUENCY <= target <= MAX_FREQUENCY:
+        raise InvalidParameterError()
+
+    first = max(math.ceil(VCO_MIN / target), OUTPUT_DIVIDERS.start)
+    last = min(VCO_MAX // target, OUTPUT_DIVIDERS.stop - 1)
+    scale = 2 * REFERENCE_FREQUENCY
+    tolerance = target * ppm / 1000000
+    best, best_error = None, None
+
+    for output_divider in range(first, last + 1):
+        vco = target * output_divider
+
+        for reference_divider in REFERENCE_DIVIDERS:
+            vco_divider = round(vco * reference_divider / scale)
+
+            if vco_divider not in VCO_DIVIDERS:
+                continue
+
+            settings = ClockSettings(reference_divider, vco_divider,
+                                     output_divider)
+            actual = frequency(settings)
+
+            error = abs(actual - target)
+
+            if not VCO_MIN <= actual * output_divider <= VCO_MAX:
+                continue
+
+            if error <= tolerance:
+                return settings
+
+            if best is None or error < best_error:
+                best, best_error = settings, error
+
+    if best is None:
+        raise InvalidParameterError()
+
+    return best
+
+
+def clock_bits(target, ppm=PPM):
+    """Gets the bits that program the clock generator to a frequency, as
+    taken by the driver's FSCC_SET_CLOCK_BITS request.
+    """
+    settings = calculate(target, ppm)
+    word = settings.reference_divider | \
+        settings.vco_divider << VCO_SHIFT | \
+        settings.output_divider << OUTPUT_SHIFT
+
+    return word.to_bytes(CLOCK_BITS_SIZE, 'little')
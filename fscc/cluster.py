@@ -0,0 +1,449 @@
+"""
+    MIT License
+
+Copyright (c) [2019] [Commtech]
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import io
+import multiprocessing
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+
+from fscc.frame import decode_timestamp
+from fscc.group import PortGroup
+
+# head, tail, frames_dropped and waiting counters at the start of a ring
+_RING_HEADER = struct.Struct('<QQQQ')
+
+# Length, port number, status size and timestamp size before each frame
+_RECORD_HEADER = struct.Struct('<IHBB')
+
+_WRAP = 0xffffffff
+
+
+def _align(size):
+    return (size + 7) & ~7
+
+
+class FrameRing(object):
+    """A shared memory ring of frames with a single writer and reader.
+
+    The writing process reads frames from its ports straight into the ring
+    and the reading process copies them out, so frames never get pickled.
+    """
+
+    def __init__(self, size=None, name=None):
+        if name is None:
+            self.shm = shared_memory.SharedMemory(
+                create=True, size=_RING_HEADER.size + _align(size))
+        else:
+            self.shm = shared_memory.SharedMemory(name)
+
+        self.name = self.shm.name
+        self.counters = self.shm.buf[:_RING_HEADER.size].cast('Q')
+        self.data = self.shm.buf[_RING_HEADER.size:]
+        self.capacity = len(self.data) & ~7
+
+    @property
+    def frames_dropped(self):
+        return self.counters[2]
+
+    def __len__(self):
+        return self.counters[0] - self.counters[1]
+
+    def reserve(self, size):
+        """Gets a view to read a frame of up to size bytes into, or None if
+        the ring is full.
+        """
+        head, tail = self.counters[0], self.counters[1]
+        position = head % self.capacity
+        needed = _align(_RECORD_HEADER.size + size)
+        contiguous = self.capacity - position
+
+        if contiguous < needed:
+            # Skip the end of the ring so the frame isn't split in two
+            if self.capacity - (head - tail) < contiguous + needed:
+                return None
+
+            struct.pack_into('<I', self.data, position, _WRAP)
+            self.counters[0] = head + contiguous
+            position = 0
+        elif self.capacity - (head - tail) < needed:
+            return None
+
+        start = position + _RECORD_HEADER.size
+        return self.data[start:start + size]
+
+    def commit(self, length, port_num, status_size, timestamp_size):
+        """Publishes the frame read into the last reserved view."""
+        head = self.counters[0]
+        position = head % self.capacity
+
+        _RECORD_HEADER.pack_into(self.data, position, length, port_num,
+                                 status_size, timestamp_size)
+        self.counters[0] = head + _align(_RECORD_HEADER.size + length)
+
+    def drop(self):
+        self.counters[2] += 1
+
+    def pop(self):
+        """Gets the next (port_num, data, status, timestamp) frame, or None
+        if the ring is empty.
+        """
+        while True:
+            head, tail = self.counters[0], self.counters[1]
+
+            if head == tail:
+                return None
+
+            position = tail % self.capacity
+            length = struct.unpack_from('<I', self.data, position)[0]
+
+            if length == _WRAP:
+                self.counters[1] = tail + self.capacity - position
+                continue
+
+            length, port_num, status_size, timestamp_size = \
+                _RECORD_HEADER.unpack_from(self.data, position)
+
+            start = position + _RECORD_HEADER.size
+            end = start + length
+            data_end = end - status_size - timestamp_size
+
+            data = self.data[start:data_end].tobytes()
+            status = timestamp = None
+
+            if status_size:
+                status = self.data[data_end:data_end + status_size].tobytes()
+
+            if timestamp_size:
+                timestamp = decode_timestamp(self.data[end - timestamp_size:
+                                                       end])
+
+            self.counters[1] = tail + _align(_RECORD_HEADER.size + length)
+
+            return (port_num, data, status, timestamp)
+
+    def close(self):
+        self.counters.release()
+        self.data.release()
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+def _resolve(port, name):
+    """Gets the object and attribute name for a dotted attribute name."""
+    *path, name = name.split('.')
+
+    for attribute in path:
+        port = getattr(port, attribute)
+
+    return port, name
+
+
+def _handle(ports, message):
+    command, port_num, name, args, kwargs = message
+    target, name = _resolve(ports[port_num], name)
+
+    if command == 'get':
+        return getattr(target, name)
+    elif command == 'set':
+        setattr(target, name, args[0])
+    else:
+        return getattr(target, name)(*args, **kwargs)
+
+
+def _worker(port_nums, ring_name, control, ready, options):
+    """Reads the worker's ports into its ring and runs control messages."""
+    from fscc.port import Port
+
+    ring = FrameRing(name=ring_name)
+
+    try:
+        ports = {n: Port(n, options['append_status'],
+                         options['append_timestamp'],
+                         backend=options['backend'])
+                 for n in port_nums}
+    except Exception as e:
+        control.send((False, e))
+        ring.close()
+        return
+
+    slot_size = options['slot_size']
+    scratch = bytearray(slot_size)
+
+    try:
+        group = PortGroup(ports.values())
+        group.register(control)
+    except io.UnsupportedOperation:
+        group = None
+
+    control.send((True, None))
+
+    try:
+        while True:
+            if group is not None:
+                waiting = group.poll(options['poll_interval'])
+            else:
+                waiting = list(ports.values()) + [control]
+
+            for port in waiting:
+                if port is control:
+                    if not control.poll():
+                        continue
+
+                    message = control.recv()
+
+                    if message is None:
+                        return
+
+                    try:
+                        control.send((True, _handle(ports, message)))
+                    except Exception as e:
+                        control.send((False, e))
+
+                    continue
+
+                view = ring.reserve(slot_size)
+                timeout = 1 if group is not None else options['poll_interval']
+
+                if view is None:
+                    if port.readinto(scratch, timeout)[0]:
+                        ring.drop()
+                    continue
+
+                length = port.readinto(view, timeout)[0]
+                view.release()
+
+                if length:
+                    ring.commit(length, port._port_num, *port._trailer_sizes())
+
+                    if ring.counters[3]:
+                        ready.set()
+    finally:
+        for port in ports.values():
+            port.close()
+
+        ring.close()
+
+
+class Cluster(object):
+    """Reads ports from a pool of worker processes.
+
+    Each worker owns some of the ports and reads their frames into a shared
+    memory ring that this process reads without any pickling. Settings,
+    register changes, purges and writes are sent to the worker that owns the
+    port.
+    """
+
+    def __init__(self, ports, workers=None, append_status=True,
+                 append_timestamp=True, backend=None, ring_size=16777216,
+                 slot_size=4096, poll_interval=100, context=None):
+        if ring_size < 2 * _align(_RECORD_HEADER.size + slot_size):
+            raise ValueError('ring_size must fit at least two frames of '
+                             'slot_size bytes')
+
+        ports = [int(p) for p in ports]
+        workers = min(workers or os.cpu_count() or 1, len(ports))
+        context = context or multiprocessing.get_context()
+
+        options = dict(append_status=append_status,
+                       append_timestamp=append_timestamp, backend=backend,
+                       slot_size=slot_size, poll_interval=poll_interval)
+
+        self._ready = context.Event()
+        self._owners = {}
+        self._workers = []
+        self._next = 0
+
+        try:
+            for i in range(workers):
+                port_nums = ports[i::workers]
+                ring = FrameRing(ring_size)
+                control, worker_control = context.Pipe()
+                process = context.Process(
+                    target=_worker, name='fscc-worker-{}'.format(i),
+                    args=(port_nums, ring.name, worker_control, self._ready,
+                          options),
+                    daemon=True)
+                process.start()
+                self._workers.append((process, ring, control))
+
+                for port_num in port_nums:
+                    self._owners[port_num] = (control, process)
+
+            for process, ring, control in self._workers:
+                self._recv_reply(control, process)
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def ports(self):
+        return list(self._owners)
+
+    @property
+    def frames_dropped(self):
+        """Number of frames dropped because a ring was full."""
+        return sum(ring.frames_dropped for _, ring, _ in self._workers)
+
+    def _recv_reply(self, control, process):
+        while not control.poll(0.1):
+            if not process.is_alive():
+                raise RuntimeError('{} exited with code {}'.format(
+                    process.name, process.exitcode))
+
+        ok, result = control.recv()
+
+        if ok is False:
+            raise result
+
+        return result
+
+    def _send(self, command, port_num, name, *args, **kwargs):
+        control, process = self._owners[port_num]
+        control.send((command, port_num, name, args, kwargs))
+        return self._recv_reply(control, process)
+
+    def get(self, port_num, name):
+        """Gets a port attribute, like 'append_status' or 'registers.BGR'."""
+        return self._send('get', port_num, name)
+
+    def set(self, port_num, name, value):
+        """Sets a port attribute, like 'append_status' or 'registers.BGR'."""
+        self._send('set', port_num, name, value)
+
+    def call(self, port_num, name, *args, **kwargs):
+        """Calls a port method, like 'purge' or 'registers.update'."""
+        return self._send('call', port_num, name, *args, **kwargs)
+
+    def _pop(self):
+        """Gets a frame from the next ring that has one."""
+        count = len(self._workers)
+
+        for i in range(count):
+            ring = self._workers[(self._next + i) % count][1]
+            frame = ring.pop()
+
+            if frame is not None:
+                self._next = (self._next + i + 1) % count
+                return frame
+
+        return None
+
+    def _wait(self, deadline):
+        """Waits for a worker to publish a frame, returns False on a
+        timeout.
+        """
+        rings = [ring for _, ring, _ in self._workers]
+
+        for ring in rings:
+            ring.counters[3] = 1
+
+        try:
+            while not any(len(ring) for ring in rings):
+                remaining = 0.01
+
+                if deadline is not None:
+                    remaining = min(deadline - time.monotonic(), remaining)
+
+                    if remaining <= 0:
+                        return False
+
+                # A short wait covers a frame published while the waiting
+                # flags were being set.
+                self._ready.wait(remaining)
+                self._ready.clear()
+        finally:
+            for ring in rings:
+                ring.counters[3] = 0
+
+        return True
+
+    def recv(self, timeout=None):
+        """Gets the next frame from any port, waiting up to timeout
+        milliseconds.
+
+        Returns (port_num, data, status, timestamp), or None if no frame was
+        received in time.
+        """
+        frame = self._pop()
+
+        if frame is not None:
+            return frame
+
+        deadline = None if timeout is None else \
+            time.monotonic() + timeout / 1000
+
+        if not self._wait(deadline):
+            return None
+
+        return self._pop()
+
+    def recv_batch(self, max_frames=None, timeout=None):
+        """Gets the frames waiting on every port, waiting up to timeout
+        milliseconds for one.
+        """
+        frame = self.recv(timeout)
+        frames = []
+
+        while frame is not None:
+            frames.append(frame)
+
+            if max_frames is not None and len(frames) >= max_frames:
+                break
+
+            frame = self._pop()
+
+        return frames
+
+    def close(self):
+        """Stops the workers, closes their ports and frees the rings."""
+        for process, ring, control in self._workers:
+            try:
+                control.send(None)
+            except OSError:
+                pass
+
+        for process, ring, control in self._workers:
+            process.join(5)
+
+            if process.is_alive():
+                process.terminate()
+                process.join()
+
+            control.close()
+            ring.close()
+            ring.unlink()
+
+        self._workers = []
+        self._owners = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
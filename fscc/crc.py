@@ -0,0 +1,167 @@
+"""
+    MIT License
+
+Copyright (c) [2019] [Commtech]
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import binascii
+import zlib
+
+from fscc.frame import FrameBatch
+
+# Every byte with its bits in reverse order
+_REVERSED = bytes(int('{:08b}'.format(i)[::-1], 2) for i in range(256))
+
+
+def _reflect(value, width):
+    return int('{:0{}b}'.format(value, width)[::-1], 2)
+
+
+def _payloads(frames):
+    """Gets the data of a FrameBatch, capture Reader or sequence of frames
+    (bytes, Frames or Records).
+    """
+    if isinstance(frames, FrameBatch):
+        return frames.views()
+
+    return (getattr(frame, 'data', frame) for frame in frames)
+
+
+class Crc(object):
+    """A CRC as HDLC sends it, with the bits of each byte reflected and the
+    CRC appended least significant byte first.
+
+    CRCs are computed a byte at a time through a 256 entry table. The
+    CRC_CCITT and CRC32 instances use the C implementations in binascii and
+    zlib instead.
+    """
+
+    def __init__(self, name, width, poly, init, xorout):
+        self.name = name
+        self.width = width
+        self.poly = poly
+        self.init = init
+        self.xorout = xorout
+        self.size = width // 8
+
+        reflected = _reflect(poly, width)
+        self.table = []
+
+        for byte in range(256):
+            crc = byte
+
+            for _ in range(8):
+                crc = (crc >> 1) ^ reflected if crc & 1 else crc >> 1
+
+            self.table.append(crc)
+
+        # The CRC of any frame followed by its CRC
+        self.residue = self.compute(self.append(b''))
+
+    def compute(self, data):
+        """Gets the CRC of a buffer."""
+        table = self.table
+        crc = self.init
+
+        for byte in memoryview(data).cast('B'):
+            crc = table[(crc ^ byte) & 0xff] ^ (crc >> 8)
+
+        return crc ^ self.xorout
+
+    def append(self, data):
+        """Gets a frame with its CRC appended, ready to be written with
+        hardware CRC disabled.
+        """
+        return bytes(data) + self.compute(data).to_bytes(self.size, 'little')
+
+    def append_many(self, frames):
+        """Gets a list of frames with their CRCs appended, for
+        Port.write_many().
+        """
+        return [self.append(frame) for frame in frames]
+
+    def check(self, frame):
+        """Checks the CRC at the end of a frame."""
+        return len(frame) >= self.size and \
+            self.compute(frame) == self.residue
+
+    def check_batch(self, frames):
+        """Checks the CRC at the end of every frame of a FrameBatch, capture
+        Reader or sequence of frames.
+
+        Returns bytes of 0 or 1 for each frame, like status.good_mask().
+        """
+        return bytes(bytearray(map(self.check, _payloads(frames))))
+
+    def __repr__(self):
+        return '<fscc.crc.Crc {}>'.format(self.name)
+
+
+class _CrcCcitt(Crc):
+    """CRC-16/CCITT through binascii.crc_hqx().
+
+    crc_hqx() computes the same CRC without reflecting the bits, so the data
+    is given to it with the bits of each byte reversed and the bits of the
+    result are reversed back.
+    """
+
+    def __init__(self):
+        Crc.__init__(self, 'CRC-16/CCITT', 16, 0x1021, 0xffff, 0xffff)
+        self._reversed_residue = binascii.crc_hqx(
+            self.append(b'').translate(_REVERSED), 0xffff)
+
+    @staticmethod
+    def _compute_reversed(data):
+        crc = binascii.crc_hqx(data, 0xffff)
+        return (_REVERSED[crc & 0xff] << 8 | _REVERSED[crc >> 8]) ^ 0xffff
+
+    def compute(self, data):
+        return self._compute_reversed(bytes(data).translate(_REVERSED))
+
+    def check_batch(self, frames):
+        if not isinstance(frames, FrameBatch):
+            return Crc.check_batch(self, frames)
+
+        # Reverse the bits of each buffer once rather than each frame
+        reversed_frames = FrameBatch(
+            [bytes(buffer).translate(_REVERSED) for buffer in frames.buffers],
+            frames.offsets, frames.sizes)
+        crc_hqx = binascii.crc_hqx
+        residue = self._reversed_residue
+
+        return bytes(bytearray(
+            len(view) >= 2 and crc_hqx(view, 0xffff) == residue
+            for view in reversed_frames.views()))
+
+
+class _Crc32(Crc):
+    """CRC-32 through zlib.crc32()."""
+
+    def __init__(self):
+        Crc.__init__(self, 'CRC-32', 32, 0x04c11db7, 0xffffffff, 0xffffffff)
+
+    def compute(self, data):
+        return zlib.crc32(data)
+
+
+CRC_CCITT = _CrcCcitt()
+CRC32 = _Crc32()
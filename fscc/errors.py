@@ -0,0 +1,105 @@
+"""
+    MIT License
+
+Copyright (c) [2019] [Commtech]
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+FSCC_TIMEOUT, FSCC_INCORRECT_MODE, \
+    FSCC_BUFFER_TOO_SMALL, \
+    FSCC_PORT_NOT_FOUND, \
+    FSCC_INVALID_ACCESS, \
+    FSCC_INVALID_PARAMETER = 16000, 16001, 16002, 16003, 16004, 16005
+
+
+class PortNotFoundError(OSError):
+    def __init__(self, port_num=None):
+        if port_num:
+            error_msg = 'Port {} not found'.format(port_num)
+        else:
+            error_msg = 'Port not found'
+
+        self.port_num = port_num
+
+        super(PortNotFoundError, self).__init__(error_msg)
+
+    def __reduce__(self):
+        return (PortNotFoundError, (self.port_num,))
+
+
+class InvalidAccessError(OSError):
+    def __init__(self):
+        super(InvalidAccessError, self).__init__('Invalid access')
+
+    def __reduce__(self):
+        return (InvalidAccessError, ())
+
+
+class TimeoutError(OSError):
+    def __str__(self):
+        return 'Command timed out (missing clock)'
+
+
+class BufferTooSmallError(OSError):
+    def __str__(self):
+        return 'Buffer too small'
+
+
+class IncorrectModeError(OSError):
+    def __str__(self):
+        return 'Incorrect mode'
+
+
+class InvalidParameterError(ValueError):
+    def __str__(self):
+        return 'Invalid parameter'
+
+
+class PartialWriteError(OSError):
+    def __init__(self, written, error):
+        self.written = written
+        self.error = error
+
+        super(PartialWriteError, self).__init__(
+            'Wrote {} frames before failing: {}'.format(len(written), error))
+
+    def __reduce__(self):
+        return (PartialWriteError, (self.written, self.error))
+
+
+def check_error(e):
+    """Raises the exception for a cfscc error code."""
+    if e == 0:
+        pass
+    elif e == FSCC_TIMEOUT:
+        raise TimeoutError()
+    elif e == FSCC_INCORRECT_MODE:
+        raise IncorrectModeError()
+    elif e == FSCC_BUFFER_TOO_SMALL:
+        raise BufferTooSmallError()
+    elif e == FSCC_PORT_NOT_FOUND:
+        raise PortNotFoundError()
+    elif e == FSCC_INVALID_ACCESS:
+        raise InvalidAccessError()
+    elif e == FSCC_INVALID_PARAMETER:
+        raise InvalidParameterError()
+    else:
+        raise OSError(e)
@@ -0,0 +1,301 @@
+"""
+    MIT License
+
+Copyright (c) [2019] [Commtech]
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+from array import array
+
+
+class Field(object):
+    """A group of bits within a register."""
+    __slots__ = ('name', 'shift', 'width', 'mask')
+
+    def __init__(self, name, shift, width=1):
+        self.name = name
+        self.shift = shift
+        self.width = width
+        self.mask = (1 << width) - 1
+
+    def decode(self, value):
+        """Gets the field out of a register value.
+
+        Works on integers and, element-wise, on NumPy arrays of values.
+        """
+        return (value >> self.shift) & self.mask
+
+    def decode_many(self, values):
+        """Gets the field out of a sequence of register values.
+
+        NumPy arrays are decoded in a single vectorized operation, any other
+        sequence is decoded into an unsigned array.
+        """
+        try:
+            return self.decode(values)
+        except TypeError:
+            shift, mask = self.shift, self.mask
+            return array('L', [(v >> shift) & mask for v in values])
+
+    def encode(self, value, field_value):
+        """Replaces the field in a register value."""
+        field_value = int(field_value)
+
+        if field_value & ~self.mask:
+            raise ValueError('{} does not fit in {} ({} bits)'.format(
+                field_value, self.name, self.width))
+
+        return (value & ~(self.mask << self.shift)) | \
+            (field_value << self.shift)
+
+    def __repr__(self):
+        return '<fscc.fields.Field {} bits={}:{}>'.format(
+            self.name, self.shift + self.width - 1, self.shift)
+
+
+class Register(object):
+    """The fields that make up a register."""
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = dict((field.name, field) for field in fields)
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__['fields'][name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __iter__(self):
+        return iter(self.fields.values())
+
+    def decode(self, value):
+        """Gets every field out of a register value."""
+        return dict((name, field.decode(value))
+                    for name, field in self.fields.items())
+
+    def decode_many(self, values):
+        """Gets every field out of a sequence of register values."""
+        return dict((name, field.decode_many(values))
+                    for name, field in self.fields.items())
+
+    def encode(self, value=0, **fields):
+        """Replaces fields in a register value."""
+        for name, field_value in fields.items():
+            value = getattr(self, name).encode(value, field_value)
+
+        return value
+
+    def __repr__(self):
+        return '<fscc.fields.Register {}>'.format(self.name)
+
+
+class RegisterValue(object):
+    """A register value that can be read field by field."""
+
+    def __init__(self, register, value):
+        self.register = register
+        self.value = value
+
+    def __getattr__(self, name):
+        register = self.__dict__['register']
+        return getattr(register, name).decode(self.__dict__['value'])
+
+    def __int__(self):
+        return self.value
+
+    def __index__(self):
+        return self.value
+
+    def __eq__(self, other):
+        return self.value == other
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __repr__(self):
+        return '{}({})'.format(self.register.name, ', '.join(
+            '{}={}'.format(name, value) for name, value in
+            self.register.decode(self.value).items()))
+
+
+# The interrupt and status bits shared by IMR and STAR
+_EVENTS = [
+    Field('rfs', 0),  # Receive frame start
+    Field('rft', 1),  # Receive FIFO trigger
+    Field('rfe', 2),  # Receive frame end
+    Field('rfo', 3),  # Receive frame overflow
+    Field('rdo', 4),  # Receive data overflow
+    Field('rfl', 5),  # Receive frame lost
+    Field('tin', 8),  # Timer expired
+    Field('tft', 16),  # Transmit FIFO trigger
+    Field('alls', 17),  # All sent
+    Field('ctss', 24),  # CTS state change
+    Field('dsrc', 25),  # DSR change
+    Field('cdc', 26),  # CD change
+]
+
+
+def _bytes(prefix, count):
+    """Gets a field for each byte of a register holding count bytes."""
+    return [Field('{}{}'.format(prefix, i), 8 * i, 8) for i in range(count)]
+
+
+# The fields described in the FSCC manual for each register in
+# Port.Registers. More fields can be described by adding them here.
+registers = {
+    'FIFOT': Register('FIFOT', [
+        Field('rft', 0, 13),
+        Field('tft', 16, 13),
+    ]),
+    'CMDR': Register('CMDR', [
+        Field('timr', 0),  # Start timer
+        Field('stimr', 1),  # Stop timer
+        Field('hunt', 16),
+        Field('rres', 17),  # Receiver reset
+        Field('xf', 24),  # Transmit frame
+        Field('xrep', 25),  # Transmit repeatedly
+        Field('txt', 26),  # Transmit on timer
+        Field('tres', 27),  # Transmitter reset
+        Field('txext', 28),  # Transmit on external signal
+    ]),
+    'STAR': Register('STAR', _EVENTS + [
+        Field('ce', 18),  # Command executing
+    ]),
+    'CCR0': Register('CCR0', [
+        Field('mode', 0, 2),
+        Field('cm', 2, 3),
+        Field('line', 5, 3),
+        Field('fsc', 8, 3),
+        Field('sflag', 11),
+        Field('itf', 12),
+        Field('nsb', 13, 3),
+        Field('ntb', 16, 3),
+        Field('vis', 19),
+        Field('crc', 20, 2),
+        Field('obt', 22),
+    ]),
+    'CCR1': Register('CCR1', [
+        Field('rts', 0),
+        Field('rtsc', 1),
+        Field('ctsc', 2),
+        Field('zins', 3),
+        Field('oins', 4),
+        Field('dps', 5),
+        Field('sync2f', 6),
+        Field('term2f', 7),
+        Field('add2f', 8),
+        Field('crc2f', 9),
+        Field('crcr', 10),
+    ]),
+    'CCR2': Register('CCR2', [
+        Field('fsro', 0, 4),  # Frame sync receive offset
+        Field('fsto', 4, 4),  # Frame sync transmit offset
+        Field('rlc', 16, 16),  # Receive length check
+    ]),
+    'BGR': Register('BGR', [
+        Field('bgr', 0, 32),
+    ]),
+    'SSR': Register('SSR', _bytes('ssr', 4)),
+    'SMR': Register('SMR', _bytes('smr', 4)),
+    'TSR': Register('TSR', _bytes('tsr', 4)),
+    'TMR': Register('TMR', _bytes('tmr', 4)),
+    'RAR': Register('RAR', _bytes('rar', 2)),
+    'RAMR': Register('RAMR', _bytes('ramr', 2)),
+    'PPR': Register('PPR', [
+        Field('pre', 0, 8),  # Preamble byte
+        Field('post', 8, 8),  # Postamble byte
+        Field('npre', 16, 8),  # Number of preambles
+        Field('npost', 24, 8),  # Number of postambles
+    ]),
+    'TCR': Register('TCR', [
+        Field('tcs', 0),  # Timer clock source
+        Field('ttype', 1),  # Timer type
+        Field('tcnt', 3, 29),  # Timer count
+    ]),
+    'VSTR': Register('VSTR', [
+        Field('prev', 0, 8),
+        Field('frev', 8, 8),
+        Field('pdev', 16, 16),
+    ]),
+    'IMR': Register('IMR', _EVENTS + [
+        Field('dr_hi', 10),
+        Field('dt_hi', 11),
+        Field('dr_fe', 12),
+        Field('dt_fe', 13),
+        Field('dr_stop', 14),
+        Field('dt_stop', 15),
+        Field('tdu', 18),  # Transmit data underrun
+        Field('ctsa', 27),
+    ]),
+    'DPLLR': Register('DPLLR', [
+        Field('dpllr', 0, 10),  # DPLL divider
+    ]),
+    # Shared by both ports of a card, A is port 0 and B port 1
+    'FCR': Register('FCR', [
+        Field('rechoa', 0),
+        Field('rechob', 1),
+        Field('rd2485a', 2),
+        Field('rd2485b', 3),
+        Field('rterma', 4),
+        Field('rtermb', 5),
+        Field('uarta', 24),
+        Field('uartb', 25),
+    ]),
+}
+
+FIFOT = registers['FIFOT']
+CMDR = registers['CMDR']
+STAR = registers['STAR']
+CCR0 = registers['CCR0']
+CCR1 = registers['CCR1']
+CCR2 = registers['CCR2']
+BGR = registers['BGR']
+SSR = registers['SSR']
+SMR = registers['SMR']
+TSR = registers['TSR']
+TMR = registers['TMR']
+RAR = registers['RAR']
+RAMR = registers['RAMR']
+PPR = registers['PPR']
+TCR = registers['TCR']
+VSTR = registers['VSTR']
+IMR = registers['IMR']
+DPLLR = registers['DPLLR']
+FCR = registers['FCR']
+
+
+class PortFields(object):
+    """Reads a port's registers as fields."""
+
+    def __init__(self, port_registers):
+        self._port_registers = port_registers
+
+    def __getattr__(self, name):
+        try:
+            register = registers[name]
+        except KeyError:
+            raise AttributeError(name)
+
+        return RegisterValue(register, self._port_registers[name])
+
+    def __dir__(self):
+        return list(registers)
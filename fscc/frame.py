@@ -0,0 +1,702 @@
+"""
+    MIT License
+
+Copyright (c) [2019] [Commtech]
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import bisect
+import ctypes
+import functools
+import os
+import struct
+import sys
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+STATUS_SIZE = 2
+STATUS_FORMAT = '<H'
+
+# The timestamp layout is picked once here rather than for every frame
+if os.name == 'nt':
+    TIMESTAMP_FORMAT = '<q'  # FILETIME
+else:
+    # struct timeval, with 32 or 64 bit longs
+    TIMESTAMP_FORMAT = '=' + 2 * ('q' if ctypes.sizeof(ctypes.c_long) == 8
+                                  else 'i')
+
+_timestamp = struct.Struct(TIMESTAMP_FORMAT)
+
+TIMESTAMP_SIZE = _timestamp.size
+
+# 100 ns FILETIME intervals between 1601 and 1970
+FILETIME_EPOCH = 116444736000000000
+
+# Frames with at least this much data are copied out of the receive buffer
+# with the data and trailer apart, so getting the data doesn't copy it again
+SPLIT_COPY_SIZE = 4096
+
+
+if os.name == 'nt':
+    def decode_timestamp(raw):
+        """Converts an appended timestamp into seconds since the epoch."""
+        return _timestamp.unpack(raw)[0] / 10000000 - 11644473600
+
+    def decode_timestamp_ns(raw):
+        """Converts an appended timestamp into nanoseconds since the epoch."""
+        return (_timestamp.unpack(raw)[0] - FILETIME_EPOCH) * 100
+
+    def _to_ns(values):
+        if numpy is not None:
+            filetimes = numpy.frombuffer(values, values.typecode)
+            return array('q', ((filetimes - FILETIME_EPOCH) * 100).tobytes())
+
+        return array('q', [(filetime - FILETIME_EPOCH) * 100
+                           for filetime in values.tolist()])
+
+    def _seconds(values, index):
+        return values[index] / 10000000 - 11644473600
+else:
+    def decode_timestamp(raw):
+        """Converts an appended timestamp into seconds since the epoch."""
+        seconds, microseconds = _timestamp.unpack(raw)
+        return seconds + (float(microseconds) / 1000000)
+
+    def decode_timestamp_ns(raw):
+        """Converts an appended timestamp into nanoseconds since the epoch."""
+        seconds, microseconds = _timestamp.unpack(raw)
+        return seconds * 1000000000 + microseconds * 1000
+
+    def _to_ns(values):
+        if numpy is not None:
+            timevals = numpy.frombuffer(values, values.typecode).astype(
+                numpy.int64)
+            return array('q', (timevals[0::2] * 1000000000 +
+                               timevals[1::2] * 1000).tobytes())
+
+        values = values.tolist()
+        return array('q', [seconds * 1000000000 + microseconds * 1000
+                           for seconds, microseconds
+                           in zip(values[::2], values[1::2])])
+
+    def _seconds(values, index):
+        return values[index] + (float(values[index + 1]) / 1000000)
+
+
+def _as_offsets(offsets):
+    if not isinstance(offsets, array) or offsets.typecode != 'Q':
+        offsets = array('Q', offsets)
+
+    return offsets
+
+
+def _gather(buffer, offsets, size):
+    """Copies size bytes from every offset in a buffer into one contiguous
+    buffer.
+
+    When the offsets are evenly spaced (fixed size frames read with
+    rx_multiple) each byte of the field is copied for every frame at once
+    with an extended slice, so the work done in Python doesn't grow with the
+    number of frames.
+    """
+    count = len(offsets)
+
+    if not count:
+        return b''
+
+    if numpy is not None:
+        index = numpy.asarray(offsets, numpy.intp)[:, None] + \
+            numpy.arange(size)
+        return numpy.frombuffer(buffer, numpy.uint8)[index].tobytes()
+
+    first = offsets[0]
+    stride = offsets[1] - first if count > 1 else size
+
+    # Overlapping, repeated or descending offsets (from take()) are gathered
+    # one at a time
+    if stride < size:
+        regular = False
+    elif isinstance(offsets, range):
+        regular = True
+    else:
+        offsets = _as_offsets(offsets)
+        regular = offsets == array('Q', range(first, first + count * stride,
+                                              stride))
+
+    if not regular:
+        view = memoryview(buffer).cast('B')
+        return b''.join([view[offset:offset + size] for offset in offsets])
+
+    end = first + count * stride
+
+    if not isinstance(buffer, bytes):
+        buffer, first, end = bytes(memoryview(buffer).cast('B')[first:end]), \
+            0, end - first
+
+    if stride == size:
+        return buffer[first:end]
+
+    gathered = bytearray(count * size)
+
+    for i in range(size):
+        gathered[i::size] = buffer[first + i:end:stride]
+
+    return gathered
+
+
+def _unpack_column(buffer, offsets, layout):
+    """Unpacks a struct layout of one repeated type (like '=qq') at every
+    offset in a buffer into a single array of the values.
+    """
+    values = array(layout[-1])
+    values.frombytes(_gather(buffer, offsets, struct.calcsize(layout)))
+
+    if layout[0] in '<>!' and (layout[0] == '<') != \
+            (sys.byteorder == 'little'):
+        values.byteswap()
+
+    return values
+
+
+def decode_status_words(buffer, offsets):
+    """Converts the appended statuses at offsets in a buffer into an array of
+    status words.
+    """
+    return _unpack_column(buffer, offsets, STATUS_FORMAT)
+
+
+def decode_timestamps_ns(buffer, offsets):
+    """Converts the appended timestamps at offsets in a buffer into an array
+    of nanoseconds since the epoch.
+
+    The timestamps are gathered and converted a column at a time rather than
+    one by one.
+    """
+    return _to_ns(_unpack_column(buffer, offsets, TIMESTAMP_FORMAT))
+
+
+def timestamps_datetime64(timestamps):
+    """Gets an array of nanoseconds as a NumPy datetime64[ns] array without
+    copying it.
+    """
+    import numpy
+
+    return numpy.frombuffer(timestamps, 'int64').view('datetime64[ns]')
+
+
+def timestamp_ns(timestamp):
+    """Converts seconds (as returned by read()), an appended timestamp or
+    nanoseconds into nanoseconds since the epoch.
+    """
+    if isinstance(timestamp, int):
+        return timestamp
+    elif isinstance(timestamp, float):
+        return round(timestamp * 1000000000)
+    else:
+        return decode_timestamp_ns(timestamp)
+
+
+def status_word(status):
+    """Converts the appended status bytes into an integer."""
+    if isinstance(status, int):
+        return status
+
+    return int.from_bytes(status, 'little')
+
+
+class TrailerDecoder(object):
+    """Splits the status and timestamp appended to a frame off its data.
+
+    The sizes and offsets for a combination of settings are worked out
+    once, so splitting a frame or copying it into a Frame is a single call
+    without any checks of the settings or platform. Use trailer_decoder() to
+    get the shared decoder for a combination.
+    """
+
+    __slots__ = ('status_size', 'timestamp_size', 'size', 'split')
+
+    def __init__(self, append_status, append_timestamp, rx_multiple=False):
+        # Frames read together can't be split apart by a single read
+        if rx_multiple:
+            append_status = append_timestamp = False
+
+        status_size = STATUS_SIZE if append_status else 0
+        timestamp_size = TIMESTAMP_SIZE if append_timestamp else 0
+        size = status_size + timestamp_size
+
+        self.status_size = status_size
+        self.timestamp_size = timestamp_size
+        self.size = size
+
+        def split(view, length):
+            """Splits a frame into data, status and timestamp views."""
+            data_size = max(length - size, 0)
+            status, timestamp = None, None
+
+            if status_size:
+                status = view[data_size:data_size + status_size]
+
+            if timestamp_size:
+                timestamp = view[length - timestamp_size:length]
+
+            return (view[:data_size], status, timestamp)
+
+        self.split = split
+
+    def frame(self, view, length):
+        """Copies a frame out of a receive buffer into a lazy Frame."""
+        end = max(length - self.size, 0)
+
+        if end < SPLIT_COPY_SIZE:
+            return Frame(view[:length].tobytes(), 0, end, self.status_size,
+                         self.timestamp_size)
+
+        return Frame(view[:end].tobytes(), 0, end, self.status_size,
+                     self.timestamp_size, view[end:length].tobytes(), 0)
+
+    def __repr__(self):
+        return 'TrailerDecoder(status_size={}, timestamp_size={})'.format(
+            self.status_size, self.timestamp_size)
+
+
+@functools.lru_cache(maxsize=None)
+def trailer_decoder(append_status, append_timestamp, rx_multiple=False):
+    """Gets the shared TrailerDecoder for a combination of settings."""
+    return TrailerDecoder(bool(append_status), bool(append_timestamp),
+                          bool(rx_multiple))
+
+
+_FIELDS = ('data', 'status', 'timestamp')
+
+
+class Frame(object):
+    """A received frame.
+
+    Keeps a reference to the buffer the frame is in along with where its
+    data starts and ends. The data, status and timestamp are only sliced out
+    and decoded when they are accessed, and the frame unpacks like the
+    (data, status, timestamp) tuple read() used to return.
+
+    The appended status and timestamp follow the data in the same buffer
+    unless a separate trailer buffer is given.
+    """
+
+    __slots__ = ('buffer', 'offset', 'size', 'status_size', 'timestamp_size',
+                 'trailer', 'trailer_offset')
+
+    def __init__(self, buffer, offset, size, status_size=0, timestamp_size=0,
+                 trailer=None, trailer_offset=None):
+        self.buffer = buffer
+        self.offset = offset
+        self.size = size
+        self.status_size = status_size
+        self.timestamp_size = timestamp_size
+
+        if trailer is None:
+            trailer, trailer_offset = buffer, offset + size
+
+        self.trailer = trailer
+        self.trailer_offset = trailer_offset
+
+    @property
+    def data(self):
+        """Gets the frame data."""
+        return self.buffer[self.offset:self.offset + self.size]
+
+    @property
+    def view(self):
+        """Gets a memoryview of the frame data without copying it."""
+        return memoryview(self.buffer)[self.offset:self.offset + self.size]
+
+    @property
+    def status(self):
+        """Gets the appended status bytes, or None if it isn't appended."""
+        if not self.status_size:
+            return None
+
+        start = self.trailer_offset
+        return self.trailer[start:start + self.status_size]
+
+    @property
+    def timestamp(self):
+        """Gets the appended timestamp in seconds since the epoch, or None if
+        it isn't appended.
+        """
+        if not self.timestamp_size:
+            return None
+
+        return _seconds(_timestamp.unpack_from(
+            self.trailer, self.trailer_offset + self.status_size), 0)
+
+    @property
+    def timestamp_ns(self):
+        """Gets the appended timestamp in nanoseconds since the epoch, or None
+        if it isn't appended.
+        """
+        if not self.timestamp_size:
+            return None
+
+        start = self.trailer_offset + self.status_size
+        return decode_timestamp_ns(
+            self.trailer[start:start + self.timestamp_size])
+
+    def __len__(self):
+        return 3
+
+    def __iter__(self):
+        yield self.data
+        yield self.status
+        yield self.timestamp
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self)[index]
+
+        return getattr(self, _FIELDS[index])
+
+    def __eq__(self, other):
+        if isinstance(other, (Frame, tuple)):
+            return tuple(self) == tuple(other)
+
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        return '<fscc.Frame size={} status={!r} timestamp={!r}>'.format(
+            self.size, self.status, self.timestamp)
+
+
+def _same_buffers(a, b):
+    return len(a) == len(b) and all(x is y for x, y in zip(a, b))
+
+
+def split_frames(length, frame_size, status_size=0, timestamp_size=0):
+    """Gets the data offsets of fixed size frames read back to back."""
+    record_size = frame_size + status_size + timestamp_size
+
+    if record_size <= 0 or length % record_size:
+        raise ValueError('{} bytes is not a whole number of {} byte '
+                         'frames'.format(length, record_size))
+
+    return array('Q', range(0, length, record_size))
+
+
+def _regular_ends(offsets, sizes, skip):
+    """Gets the ends of evenly spaced frames of the same size as a range, or
+    None if the frames aren't laid out that way.
+    """
+    count = len(offsets)
+
+    if count < 2:
+        return None
+
+    first, size = offsets[0], sizes[0]
+    stride = offsets[1] - first
+    offsets = _as_offsets(offsets)
+
+    if stride <= 0 or offsets != array('Q', range(
+            first, first + count * stride, stride)):
+        return None
+
+    if sizes.count(size) != count:
+        return None
+
+    start = first + size + skip
+    return range(start, start + count * stride, stride)
+
+
+class FrameBatch(object):
+    """Frames received by batch reads, kept as columns.
+
+    The data of each frame stays in the buffer it was read into, followed by
+    its appended status and timestamp. The batch only holds typed arrays of
+    where each frame's data starts and how long it is, with the buffers
+    addressed as if they were joined end to end, so slicing, filtering and
+    concatenating batches never copy the data.
+
+    The status words and timestamps (in nanoseconds) are decoded into arrays
+    the first time they are used.
+    """
+
+    def __init__(self, buffers, offsets, sizes, status_size=0,
+                 timestamp_size=0):
+        self.buffers = tuple(buffers)
+        self.offsets = offsets
+        self.sizes = sizes
+        self.status_size = status_size
+        self.timestamp_size = timestamp_size
+
+        self._statuses = None
+        self._timestamps = None
+
+        self._starts = [0]
+
+        for buffer in self.buffers[:-1]:
+            self._starts.append(self._starts[-1] + len(buffer))
+
+    @classmethod
+    def from_buffer(cls, buffer, frame_size=None, status_size=0,
+                    timestamp_size=0):
+        """Splits a buffer of back to back frames into a batch.
+
+        If no frame size is given the whole buffer is a single frame.
+        Raises ValueError if the buffer is too short to hold the status and
+        timestamp appended to a frame.
+        """
+        length = len(buffer)
+
+        if not length:
+            return cls((buffer,), array('Q'), array('I'), status_size,
+                       timestamp_size)
+
+        if frame_size is None:
+            frame_size = length - status_size - timestamp_size
+
+        if frame_size < 0:
+            raise ValueError('{} bytes is too short for a frame with a {} '
+                             'byte status and timestamp'.format(
+                                 length, status_size + timestamp_size))
+
+        offsets = split_frames(length, frame_size, status_size,
+                               timestamp_size)
+        sizes = array('I', [frame_size]) * len(offsets)
+
+        return cls((buffer,), offsets, sizes, status_size, timestamp_size)
+
+    @classmethod
+    def concat(cls, batches):
+        """Joins batches into one without copying their data.
+
+        The batches need the same status and timestamp settings.
+        """
+        batches = list(batches)
+
+        if not batches:
+            return cls.from_buffer(b'')
+
+        first = batches[0]
+        trailer = (first.status_size, first.timestamp_size)
+
+        if any((batch.status_size, batch.timestamp_size) != trailer
+               for batch in batches):
+            raise ValueError('batches have different status and timestamp '
+                             'settings')
+
+        buffers = []
+        offsets = array('Q')
+        sizes = array('I')
+
+        for batch in batches:
+            if _same_buffers(batch.buffers, first.buffers):
+                # Slices of the same batch share its buffers
+                offsets.extend(batch.offsets)
+            else:
+                shift = sum(len(buffer) for buffer in buffers)
+                buffers.extend(batch.buffers)
+                offsets.extend([offset + shift for offset in batch.offsets])
+
+            sizes.extend(batch.sizes)
+
+            if batch is first:
+                buffers.extend(first.buffers)
+
+        joined = cls(buffers, offsets, sizes, *trailer)
+
+        if all(batch._statuses is not None for batch in batches):
+            joined._statuses = array('H')
+
+            for batch in batches:
+                joined._statuses.extend(batch._statuses)
+
+        if all(batch._timestamps is not None for batch in batches):
+            joined._timestamps = array('q')
+
+            for batch in batches:
+                joined._timestamps.extend(batch._timestamps)
+
+        return joined
+
+    @property
+    def nbytes(self):
+        """Gets the combined size of the frame data."""
+        return sum(self.sizes)
+
+    @property
+    def statuses(self):
+        """Gets the status word of every frame, or None if the status isn't
+        appended.
+        """
+        if self._statuses is None and self.status_size:
+            self._statuses = array('H')
+
+            for buffer, offsets in self._trailers(0):
+                self._statuses.extend(decode_status_words(buffer, offsets))
+
+        return self._statuses
+
+    @property
+    def timestamps(self):
+        """Gets the timestamp of every frame in nanoseconds since the epoch,
+        or None if timestamps aren't appended.
+        """
+        if self._timestamps is None and self.timestamp_size:
+            self._timestamps = array('q')
+
+            for buffer, offsets in self._trailers(self.status_size):
+                self._timestamps.extend(decode_timestamps_ns(buffer,
+                                                             offsets))
+
+        return self._timestamps
+
+    def _trailers(self, skip):
+        """Gets the offsets of each frame's trailer (plus skip bytes) in runs
+        of frames from the same buffer.
+        """
+        if len(self.buffers) == 1:
+            if numpy is not None:
+                ends = numpy.asarray(self.offsets, numpy.intp) + \
+                    numpy.asarray(self.sizes, numpy.intp) + skip
+            else:
+                ends = _regular_ends(self.offsets, self.sizes, skip)
+
+                if ends is None:
+                    ends = [offset + size + skip for offset, size
+                            in zip(self.offsets, self.sizes)]
+
+            return [(self.buffers[0], ends)]
+
+        ends = [offset + size + skip for offset, size
+                in zip(self.offsets, self.sizes)]
+
+        runs = []
+
+        for end in ends:
+            index = bisect.bisect_right(self._starts, end) - 1
+
+            if not runs or runs[-1][0] != index:
+                runs.append((index, []))
+
+            runs[-1][1].append(end - self._starts[index])
+
+        return [(self.buffers[index], offsets) for index, offsets in runs]
+
+    def _with_columns(self, offsets, sizes, statuses, timestamps):
+        batch = FrameBatch(self.buffers, offsets, sizes, self.status_size,
+                           self.timestamp_size)
+        batch._statuses = statuses
+        batch._timestamps = timestamps
+        return batch
+
+    def take(self, indices):
+        """Gets a batch of the frames at indices without copying their
+        data.
+        """
+        indices = list(indices)
+        statuses, timestamps = self._statuses, self._timestamps
+
+        if statuses is not None:
+            statuses = array('H', [statuses[i] for i in indices])
+
+        if timestamps is not None:
+            timestamps = array('q', [timestamps[i] for i in indices])
+
+        return self._with_columns(
+            array('Q', [self.offsets[i] for i in indices]),
+            array('I', [self.sizes[i] for i in indices]), statuses,
+            timestamps)
+
+    def filter_status(self, set_flags=0, clear_flags=0):
+        """Gets a batch of the frames whose status word has all of set_flags
+        and none of clear_flags set.
+        """
+        statuses = self.statuses
+
+        if statuses is None:
+            raise ValueError('the status is not appended to these frames')
+
+        return self.take(i for i, status in enumerate(statuses)
+                         if status & set_flags == set_flags and
+                         not status & clear_flags)
+
+    def views(self):
+        """Iterates over memoryviews of each frame's data without copying
+        it.
+        """
+        views = [memoryview(buffer) for buffer in self.buffers]
+
+        if len(views) == 1:
+            view = views[0]
+
+            for offset, size in zip(self.offsets, self.sizes):
+                yield view[offset:offset + size]
+        else:
+            starts = self._starts
+
+            for offset, size in zip(self.offsets, self.sizes):
+                i = bisect.bisect_right(starts, offset) - 1
+                offset -= starts[i]
+                yield views[i][offset:offset + size]
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            statuses, timestamps = self._statuses, self._timestamps
+
+            return self._with_columns(
+                self.offsets[index], self.sizes[index],
+                None if statuses is None else statuses[index],
+                None if timestamps is None else timestamps[index])
+
+        offset = self.offsets[index]
+        buffer = self.buffers[0]
+
+        if len(self.buffers) > 1:
+            i = bisect.bisect_right(self._starts, offset) - 1
+            buffer, offset = self.buffers[i], offset - self._starts[i]
+
+        return Frame(buffer, offset, self.sizes[index], self.status_size,
+                     self.timestamp_size)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __add__(self, other):
+        if not isinstance(other, FrameBatch):
+            return NotImplemented
+
+        return FrameBatch.concat((self, other))
+
+    def __repr__(self):
+        return '<fscc.FrameBatch frames={} bytes={}>'.format(len(self),
+                                                            self.nbytes)
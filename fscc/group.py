@@ -0,0 +1,148 @@
+"""
+    MIT License
+
+Copyright (c) [2019] [Commtech]
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import select
+import selectors
+
+
+class PortGroup(object):
+    """Waits on many ports from a single thread.
+
+    On Linux this is an epoll set of the ports' file descriptors, so waiting
+    costs the same however many ports are in the group and only the ports
+    with frames waiting are read. Ports without a file descriptor (Windows)
+    can't be added.
+    """
+
+    def __init__(self, ports=()):
+        self._ports = {}
+        self._frame_sizes = {}
+
+        if hasattr(select, 'epoll'):
+            self._epoll = select.epoll()
+            self._selector = None
+        else:
+            self._epoll = None
+            self._selector = selectors.DefaultSelector()
+
+        for port in ports:
+            self.register(port)
+
+    def register(self, port, frame_size=None):
+        """Adds a port to the group.
+
+        frame_size is passed to read_frames() when reading the port with
+        rx_multiple enabled.
+        """
+        fd = port.fileno()
+
+        if self._epoll is not None:
+            self._epoll.register(fd, select.EPOLLIN)
+        else:
+            self._selector.register(fd, selectors.EVENT_READ)
+
+        self._ports[fd] = port
+        self._frame_sizes[fd] = frame_size
+
+    def unregister(self, port):
+        """Removes a port from the group."""
+        fd = port.fileno()
+
+        if self._epoll is not None:
+            self._epoll.unregister(fd)
+        else:
+            self._selector.unregister(fd)
+
+        del self._ports[fd]
+        del self._frame_sizes[fd]
+
+    def _ready(self, timeout):
+        """Gets the file descriptors with frames waiting."""
+        if self._epoll is not None:
+            timeout = -1 if timeout is None else timeout / 1000
+            events = self._epoll.poll(timeout, len(self._ports) or 1)
+            return [fd for fd, _ in events]
+
+        if timeout is not None:
+            timeout = timeout / 1000
+
+        return [key.fd for key, _ in self._selector.select(timeout)]
+
+    def poll(self, timeout=None):
+        """Gets the ports with frames waiting, waiting up to timeout
+        milliseconds for one. Returns an empty list on a timeout.
+        """
+        ports = self._ports
+        return [ports[fd] for fd in self._ready(timeout)]
+
+    def read_ready(self, timeout=None, max_bytes=65536):
+        """Reads the ports with frames waiting.
+
+        Returns a list of (port, FrameBatch) with a batch from each port that
+        had frames waiting, after waiting up to timeout milliseconds for one.
+        Ports that have more frames waiting than fit in a batch are ready
+        again on the next call.
+        """
+        batches = []
+
+        for fd in self._ready(timeout):
+            port = self._ports[fd]
+
+            # The data is already waiting, the short timeout only guards
+            # against a spurious wake up blocking the other ports.
+            batch = port.read_frames(max_bytes, 1, self._frame_sizes[fd])
+
+            if len(batch):
+                batches.append((port, batch))
+
+        return batches
+
+    def close(self):
+        """Stops waiting on the ports, the ports are left open."""
+        if self._epoll is not None:
+            self._epoll.close()
+        else:
+            self._selector.close()
+
+        self._ports.clear()
+        self._frame_sizes.clear()
+
+    def __len__(self):
+        return len(self._ports)
+
+    def __iter__(self):
+        return iter(list(self._ports.values()))
+
+    def __contains__(self, port):
+        return any(p is port for p in self._ports.values())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return 'fscc.PortGroup({})'.format(list(self._ports.values()))
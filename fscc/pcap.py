@@ -0,0 +1,395 @@
+"""
+    MIT License
+
+Copyright (c) [2019] [Commtech]
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import itertools
+import mmap
+import re
+import struct
+
+from fscc.capture import Record, _write_all
+from fscc.frame import status_word, timestamp_ns
+from fscc.status import CRC_OK
+
+# Cisco HDLC, use LINKTYPE_PPP_HDLC (50) or another link type for frames that
+# carry something else
+LINKTYPE_C_HDLC = 104
+
+# The status bit set when the frame's CRC was correct
+STATUS_CRC_OK = CRC_OK
+
+SECTION_HEADER = 0x0a0d0d0a
+INTERFACE_DESCRIPTION = 0x00000001
+SIMPLE_PACKET = 0x00000003
+ENHANCED_PACKET = 0x00000006
+BYTE_ORDER_MAGIC = 0x1a2b3c4d
+
+OPT_ENDOFOPT = 0
+OPT_COMMENT = 1
+IF_NAME = 2
+IF_TSRESOL = 9
+EPB_FLAGS = 2
+
+# Inbound, with the CRC error bit of the link layer errors
+EPB_INBOUND = 0x00000001
+EPB_CRC_ERROR = 0x01000000
+
+# Classic pcap, with microsecond and nanosecond timestamps
+PCAP_MAGIC = 0xa1b2c3d4
+PCAP_NSEC_MAGIC = 0xa1b23c4d
+
+_PACKET_HEADER = struct.Struct('<IIIIIII')
+_LENGTH = struct.Struct('<I')
+_PADDING = (b'', b'\0\0\0', b'\0\0', b'\0')
+
+_STATUS_COMMENT = re.compile(rb'status=0x([0-9a-fA-F]+)')
+
+
+def _padded(size):
+    return (size + 3) & ~3
+
+
+def _option(code, value):
+    return struct.pack('<HH', code, len(value)) + value + \
+        bytes(_padded(len(value)) - len(value))
+
+
+def _block(block_type, body):
+    length = 12 + len(body)
+    return struct.pack('<II', block_type, length) + body + \
+        struct.pack('<I', length)
+
+
+class Writer(object):
+    """Writes frames to a pcapng file.
+
+    Each port gets an interface (named fsccN) with nanosecond timestamps.
+    The status of each frame is kept in its comment and a frame without the
+    CRC OK status bit is flagged as a CRC error. Blocks are assembled in a
+    buffer that is written with a single call once it fills.
+    """
+
+    def __init__(self, path, linktype=LINKTYPE_C_HDLC, snaplen=0,
+                 buffer_size=4194304):
+        self.path = path
+        self.linktype = linktype
+        self.snaplen = snaplen
+        self.frames = 0
+
+        self._file = open(path, 'wb', buffering=0)
+        self._interfaces = {}
+        self._status_options = {}
+        self._buffer = bytearray()
+        self._buffer_size = buffer_size
+
+        self._buffer += _block(SECTION_HEADER, struct.pack(
+            '<IHHq', BYTE_ORDER_MAGIC, 1, 0, -1) + _option(OPT_ENDOFOPT, b''))
+
+    def _interface(self, port):
+        """Gets the interface of a port, describing it the first time."""
+        try:
+            return self._interfaces[port]
+        except KeyError:
+            pass
+
+        options = _option(IF_NAME, 'fscc{}'.format(port).encode()) + \
+            _option(IF_TSRESOL, b'\x09') + _option(OPT_ENDOFOPT, b'')
+        self._buffer += _block(INTERFACE_DESCRIPTION, struct.pack(
+            '<HHI', self.linktype, 0, self.snaplen) + options)
+
+        interface = self._interfaces[port] = len(self._interfaces)
+        return interface
+
+    def _options(self, status):
+        """Gets the options of a packet with a status, which are the same
+        for every packet with that status.
+        """
+        status = status_word(status)
+
+        try:
+            return self._status_options[status]
+        except KeyError:
+            pass
+
+        flags = EPB_INBOUND
+
+        if not status & STATUS_CRC_OK:
+            flags |= EPB_CRC_ERROR
+
+        options = _option(OPT_COMMENT,
+                          'status=0x{:04x}'.format(status).encode()) + \
+            _option(EPB_FLAGS, struct.pack('<I', flags)) + \
+            _option(OPT_ENDOFOPT, b'')
+
+        self._status_options[status] = options
+        return options
+
+    def write(self, data, status=None, timestamp=None, port=0):
+        """Writes a frame, with the same arguments as
+        capture.Recorder.write().
+        """
+        timestamp = 0 if timestamp is None else timestamp_ns(timestamp)
+        options = b'' if status is None else self._options(status)
+
+        self._packet(data, self._interface(port), options, timestamp)
+
+    def _packet(self, data, interface, options, timestamp):
+        """Writes an enhanced packet block with a timestamp in
+        nanoseconds.
+        """
+        length = len(data)
+        padding = _PADDING[length & 3]
+        total = 32 + length + len(padding) + len(options)
+        buffer = self._buffer
+
+        buffer += _PACKET_HEADER.pack(ENHANCED_PACKET, total, interface,
+                                      timestamp >> 32, timestamp & 0xffffffff,
+                                      length, length)
+        buffer += data
+        buffer += padding
+        buffer += options
+        buffer += _LENGTH.pack(total)
+
+        self.frames += 1
+
+        if len(buffer) >= self._buffer_size:
+            self.flush()
+
+    def write_batch(self, batch, port=0):
+        """Writes every frame of a FrameBatch.
+
+        The status and timestamp of each frame come from the batch's integer
+        columns, so the timestamps are written to the nanosecond.
+        """
+        interface = self._interface(port)
+        statuses, timestamps = batch.statuses, batch.timestamps
+
+        if statuses is None:
+            options = itertools.repeat(b'')
+        else:
+            options = map(self._options, statuses)
+
+        if timestamps is None:
+            timestamps = itertools.repeat(0)
+
+        for data, packet_options, timestamp in zip(batch.views(), options,
+                                                   timestamps):
+            self._packet(data, interface, packet_options, timestamp)
+
+    def write_capture(self, reader):
+        """Writes every frame of a capture.Reader."""
+        for port, data, status, timestamp in reader:
+            self.write(data, status, timestamp, port)
+            data.release()
+
+    def flush(self):
+        if self._buffer:
+            _write_all(self._file, self._buffer)
+            self._buffer = bytearray()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class Reader(object):
+    """Reads the frames of a pcapng (or classic pcap) file through a memory
+    map.
+
+    Frames are returned as capture.Record tuples with the data as a view of
+    the file, the port number from the fsccN interface name (or the
+    interface number), the status from the comment written by Writer and the
+    timestamp in nanoseconds.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __iter__(self):
+        magic = struct.unpack_from('<I', self._map)[0]
+
+        if magic == SECTION_HEADER:
+            return self._pcapng()
+        elif magic in (PCAP_MAGIC, PCAP_NSEC_MAGIC) or \
+                struct.unpack_from('>I', self._map)[0] in (PCAP_MAGIC,
+                                                           PCAP_NSEC_MAGIC):
+            return self._pcap()
+
+        raise ValueError('{} is not a pcap or pcapng file'.format(self.path))
+
+    def _pcap(self):
+        view = memoryview(self._map)
+        endian = '<' if struct.unpack_from('<I', view)[0] in (
+            PCAP_MAGIC, PCAP_NSEC_MAGIC) else '>'
+        magic = struct.unpack_from(endian + 'I', view)[0]
+        scale = 1 if magic == PCAP_NSEC_MAGIC else 1000
+        header = struct.Struct(endian + 'IIII')
+        offset = 24
+
+        while offset < len(view):
+            if offset + header.size > len(view):
+                raise self._corrupt(offset, 'truncated packet header')
+
+            seconds, fraction, length, _ = header.unpack_from(view, offset)
+            start = offset + header.size
+            offset = start + length
+
+            if offset > len(view):
+                raise self._corrupt(start, 'truncated packet')
+
+            yield Record(0, view[start:offset], None,
+                         seconds * 1000000000 + fraction * scale)
+
+    def _pcapng(self):
+        view = memoryview(self._map)
+        offset = 0
+        endian = '<'
+        interfaces = []
+        block = struct.Struct('<II')
+        packet = struct.Struct('<IIIII')
+
+        while offset < len(view):
+            if offset + 12 > len(view):
+                raise self._corrupt(offset, 'truncated block')
+
+            block_type, length = block.unpack_from(view, offset)
+
+            if block_type == SECTION_HEADER:
+                if struct.unpack_from('<I', view, offset + 8)[0] == \
+                        BYTE_ORDER_MAGIC:
+                    endian = '<'
+                else:
+                    endian = '>'
+
+                length = struct.unpack_from(endian + 'I', view, offset + 4)[0]
+                interfaces = []
+                block = struct.Struct(endian + 'II')
+                packet = struct.Struct(endian + 'IIIII')
+
+            if length < 12 or length % 4 or offset + length > len(view):
+                raise self._corrupt(offset, 'bad block length {}'.format(
+                    length))
+
+            if block_type == INTERFACE_DESCRIPTION:
+                interfaces.append(self._interface(
+                    view[offset + 16:offset + length - 4], endian,
+                    len(interfaces)))
+            elif block_type == ENHANCED_PACKET:
+                if length < 32:
+                    raise self._corrupt(offset, 'truncated packet block')
+
+                interface, high, low, captured, _ = packet.unpack_from(
+                    view, offset + 8)
+                start = offset + 28
+
+                if start + captured > offset + length - 4:
+                    raise self._corrupt(offset, 'truncated packet data')
+                elif interface >= len(interfaces):
+                    raise self._corrupt(offset, 'unknown interface {}'.format(
+                        interface))
+
+                port, resolution = interfaces[interface]
+                status = None
+
+                if start + _padded(captured) < offset + length - 4:
+                    match = _STATUS_COMMENT.search(
+                        view, start + _padded(captured), offset + length - 4)
+
+                    if match:
+                        status = int(match.group(1), 16)
+
+                timestamp = ((high << 32) | low) * resolution
+
+                yield Record(port, view[start:start + captured], status,
+                             round(timestamp))
+            elif block_type == SIMPLE_PACKET:
+                captured = struct.unpack_from(endian + 'I', view,
+                                              offset + 8)[0]
+                start = offset + 12
+
+                if start + captured > offset + length - 4:
+                    raise self._corrupt(offset, 'truncated packet data')
+                elif not interfaces:
+                    raise self._corrupt(offset, 'no interface')
+
+                yield Record(interfaces[0][0],
+                             view[start:start + captured], None, None)
+
+            offset += length
+
+    def _corrupt(self, offset, reason):
+        return ValueError('{} is corrupt at offset {}: {}'.format(
+            self.path, offset, reason))
+
+    @staticmethod
+    def _interface(options, endian, number):
+        """Gets the port number and nanoseconds per tick of an interface."""
+        port, resolution = number, 1000
+        offset = 0
+
+        while offset + 4 <= len(options):
+            code, length = struct.unpack_from(endian + 'HH', options, offset)
+            value = options[offset + 4:offset + 4 + length]
+
+            if code == OPT_ENDOFOPT:
+                break
+            elif code == IF_NAME:
+                match = re.match(rb'fscc(\d+)$', value.tobytes())
+
+                if match:
+                    port = int(match.group(1))
+            elif code == IF_TSRESOL:
+                exponent = value[0]
+
+                if exponent & 0x80:
+                    resolution = 1000000000 / 2 ** (exponent & 0x7f)
+                else:
+                    resolution = 10 ** (9 - exponent)
+
+            offset += 4 + _padded(length)
+
+        return port, resolution
+
+    def close(self):
+        """Closes the file, once any views of frame data are released."""
+        try:
+            self._map.close()
+        except BufferError:
+            # Closed when the last view of it goes away
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -23,74 +23,23 @@ SOFTWARE.
 
 """
 
-import struct
 import os
 import ctypes
-import sys
 import json
+from array import array
+import contextlib
+from types import MappingProxyType
 
-if os.name == 'nt':
-    DLL_NAME = 'cfscc.dll'
-else:
-    if ctypes.sizeof(ctypes.c_voidp) == 4:
-        DLL_NAME = 'libcfscc.so'
-    else:
-        DLL_NAME = 'libcfscc.so.6'
-
-try:
-    lib = ctypes.cdll.LoadLibrary(DLL_NAME)
-except:
-    if os.name == 'nt':
-        lib = ctypes.cdll.LoadLibrary(os.path.join(sys.prefix, 'DLLS',
-                                                   DLL_NAME))
-    else:
-        lib = ctypes.cdll.LoadLibrary(os.path.join(sys.prefix, 'local', 'DLLs',
-                                                   DLL_NAME))
-
+from fscc.backend import FsccMemoryCap, FsccRegisters, get_backend
+from fscc.errors import *
+from fscc.fields import PortFields
+from fscc.frame import (STATUS_SIZE, TIMESTAMP_SIZE, FrameBatch,
+                        trailer_decoder)
+from fscc.receiver import Receiver
 
 FSCC_UPDATE_VALUE = -2
 
 XF, XREP, TXT, TXEXT = 0, 1, 2, 4
-FSCC_TIMEOUT, FSCC_INCORRECT_MODE, \
-    FSCC_BUFFER_TOO_SMALL, \
-    FSCC_PORT_NOT_FOUND, \
-    FSCC_INVALID_ACCESS, \
-    FSCC_INVALID_PARAMETER = 16000, 16001, 16002, 16003, 16004, 16005
-
-
-class PortNotFoundError(OSError):
-    def __init__(self, port_num=None):
-        if port_num:
-            error_msg = 'Port {} not found'.format(port_num)
-        else:
-            error_msg = 'Port not found'
-
-        super(PortNotFoundError, self).__init__(error_msg)
-
-
-class InvalidAccessError(OSError):
-    def __init__(self):
-        super(InvalidAccessError, self).__init__('Invalid access')
-
-
-class TimeoutError(OSError):
-    def __str__(self):
-        return 'Command timed out (missing clock)'
-
-
-class BufferTooSmallError(OSError):
-    def __str__(self):
-        return 'Buffer too small'
-
-
-class IncorrectModeError(OSError):
-    def __str__(self):
-        return 'Incorrect mode'
-
-
-class InvalidParameterError(ValueError):
-    def __str__(self):
-        return 'Invalid parameter'
 
 
 class Port(object):
@@ -107,91 +56,153 @@ class Port(object):
         editable_register_names = [r for r in register_names if r not in
                                    ['STAR', 'VSTR']]
 
+        # Slots of each register in the driver's struct fscc_registers
+        register_indexes = {'FIFOT': 2, 'CMDR': 5, 'STAR': 6, 'CCR0': 7,
+                            'CCR1': 8, 'CCR2': 9, 'BGR': 10, 'SSR': 11,
+                            'SMR': 12, 'TSR': 13, 'TMR': 14, 'RAR': 15,
+                            'RAMR': 16, 'PPR': 17, 'TCR': 18, 'VSTR': 19,
+                            'IMR': 21, 'DPLLR': 22, 'FCR': 23}
+
+        _RegisterFile = FsccRegisters
+
         def __init__(self, port):
             self.port = port
-            self._clear_registers()
+            self._pending = None
+            self._registers = self._RegisterFile()
+
+        @classmethod
+        def _build_tables(cls):
+            """Builds the register lookup tables and properties."""
+            cls.register_slots = dict(
+                (i, r) for r, i in cls.register_indexes.items())
+
+            cls._readable_slots = [
+                (r, cls.register_indexes[r]) for r in cls.register_names
+                if r not in cls.writeonly_register_names]
 
-            for register in self.register_names:
-                self._add_register(register)
+            cls._snapshot_registers = cls._RegisterFile(*[-1] * 24)
+            for register, index in cls._readable_slots:
+                cls._snapshot_registers[index] = FSCC_UPDATE_VALUE
 
-        def _internal_registers(self):
-            return [-1, -1, self._FIFOT, -1, -1, self._CMDR, self._STAR,
-                    self._CCR0, self._CCR1, self._CCR2, self._BGR,
-                    self._SSR, self._SMR, self._TSR, self._TMR, self._RAR,
-                    self._RAMR, self._PPR, self._TCR, self._VSTR, -1,
-                    self._IMR, self._DPLLR, self._FCR]
+            for register in cls.register_names:
+                cls._add_register(register)
 
-        def _add_register(self, register):
-            """Dynamically add a way to edit a register to the port."""
-            if register not in self.writeonly_register_names:
-                fget = lambda self: self._get_register(register)
+        @classmethod
+        def _add_register(cls, register):
+            """Add a way to edit a register to the class."""
+            index = cls.register_indexes[register]
+
+            if register not in cls.writeonly_register_names:
+                fget = lambda self: self._get_index(index)
             else:
                 fget = None
 
-            if register not in self.readonly_register_names:
-                fset = lambda self, value: self._set_register(register, value)
+            if register not in cls.readonly_register_names:
+                fset = lambda self, value: self._set_index(index, value)
             else:
                 fset = None
 
-            setattr(self.__class__, register, property(fget, fset, None, ""))
+            setattr(cls, register, property(fget, fset, None, ""))
 
         def _get_register(self, register):
             """Gets the value of a register."""
+            return self._get_index(self.register_indexes[register])
+
+        def _set_register(self, register, value):
+            """Sets the value of a register."""
+            self._set_index(self.register_indexes[register], value)
+
+        def _get_index(self, index):
+            """Gets the value of the register in a slot."""
             self._clear_registers()
-            setattr(self, '_%s' % register, FSCC_UPDATE_VALUE)
+            self._registers[index] = FSCC_UPDATE_VALUE
             self._get_registers()
 
-            return getattr(self, '_%s' % register)
+            return self._registers[index]
+
+        def _set_index(self, index, value):
+            """Sets the value of the register in a slot."""
+            if self._pending is not None:
+                self._pending[self.register_slots[index]] = int(value)
+                return
 
-        def _set_register(self, register, value):
-            """Sets the value of a register."""
             self._clear_registers()
-            setattr(self, '_%s' % register, int(value))
+            self._registers[index] = int(value)
             self._set_registers()
 
         def _clear_registers(self):
             """Clears the stored register values."""
-            for register in self.register_names:
-                setattr(self, "_%s" % register, -1)
+            ctypes.memset(self._registers, 0xff, ctypes.sizeof(
+                self._registers))
 
         def _get_registers(self):
-            """Gets all of the register values."""
-            registers = self._internal_registers()
+            """Gets the register values marked with FSCC_UPDATE_VALUE."""
+            self.port._backend.get_registers(self.port._handle,
+                                             self._registers)
 
-            fmt = 'q' * len(registers)
-            regs = self.port._ctypes_get_struct(lib.fscc_get_registers, fmt,
-                                                registers)
+        def _set_registers(self):
+            """Sets the register values that aren't -1."""
+            self.port._backend.set_registers(self.port._handle,
+                                             self._registers)
 
-            for i, register in enumerate(registers):
-                if register != -1:
-                    self._set_register_by_index(i, regs[i])
+        def update(self, values):
+            """Sets the value of several registers in a single call."""
+            values = dict(values)
 
-        def _set_registers(self):
-            """Sets all of the register values."""
-            registers = self._internal_registers()
+            for register in values:
+                if register not in self.editable_register_names:
+                    raise AttributeError(
+                        "Register '{}' can't be set".format(register))
 
-            fmt = 'q' * len(registers)
-            buf = struct.pack(fmt, *registers)
-            e = lib.fscc_set_registers(self.port._handle, buf)
+            if self._pending is not None:
+                self._pending.update(
+                    (r, int(v)) for r, v in values.items())
+                return
 
-            if e == 0:
-                pass
-            elif e == FSCC_TIMEOUT:
-                raise TimeoutError()
-            else:
-                raise OSError(e)
+            self._clear_registers()
+
+            for register, value in values.items():
+                self._registers[self.register_indexes[register]] = int(value)
+
+            self._set_registers()
+
+        @contextlib.contextmanager
+        def batch(self):
+            """Collects the register writes made inside of the block.
+
+            The writes are set in a single call when the block exits, or
+            thrown away if the block raises an exception.
+            """
+            if self._pending is not None:
+                yield self
+                return
 
-        def _set_register_by_index(self, index, value):
-            """Sets the value of a register by it's index."""
-            data = [('FIFOT', 2), ('CMDR', 5), ('STAR', 6), ('CCR0', 7),
-                    ('CCR1', 8), ('CCR2', 9), ('BGR', 10), ('SSR', 11),
-                    ('SMR', 12), ('TSR', 13), ('TMR', 14), ('RAR', 15),
-                    ('RAMR', 16), ('PPR', 17), ('TCR', 18), ('VSTR', 19),
-                    ('IMR', 21), ('DPLLR', 22), ('FCR', 23)]
+            self._pending = {}
 
-            for r, i in data:
-                if i == index:
-                    setattr(self, '_%s' % r, value)
+            try:
+                yield self
+                pending = self._pending
+            finally:
+                self._pending = None
+
+            if pending:
+                self.update(pending)
+
+        @property
+        def fields(self):
+            """Gets the register values as named fields."""
+            return PortFields(self)
+
+        def snapshot(self):
+            """Gets the value of every readable register in a single call."""
+            registers = self._registers
+            ctypes.memmove(registers, self._snapshot_registers,
+                           ctypes.sizeof(registers))
+
+            self._get_registers()
+
+            return MappingProxyType(dict(
+                (r, registers[i]) for r, i in self._readable_slots))
 
         def __len__(self):
             return len(self.register_names)
@@ -203,11 +214,10 @@ class Port(object):
             self._set_register(key, value)
 
         def __iter__(self):
+            snapshot = self.snapshot()
+
             for reg_name in self.register_names:
-                if reg_name not in self.writeonly_register_names:
-                    yield (reg_name, self[reg_name])
-                else:
-                    yield (reg_name, None)
+                yield (reg_name, snapshot.get(reg_name))
 
         def __str__(self):
             reg_values = []
@@ -231,11 +241,8 @@ class Port(object):
             return json.dumps(self._to_json(), *args, **kwargs)
 
         def from_json(self, json):
-            for name, value in json.items():
-                try:
-                    setattr(self, name, int(value, 0))
-                except AttributeError:
-                    pass
+            self.update((name, int(value, 0)) for name, value in json.items()
+                        if name in self.editable_register_names)
 
     class MemoryCap(object):
 
@@ -244,14 +251,14 @@ class Port(object):
 
         def _set_memcap(self, input_memcap, output_memcap):
             """Sets the value of the memory cap setting."""
-            fmt = 'i' * 2
-            buf = struct.pack(fmt, input_memcap, output_memcap)
-            lib.fscc_set_memory_cap(self.port._handle, buf)
+            memcap = FsccMemoryCap(input_memcap, output_memcap)
+            self.port._backend.set_memory_cap(self.port._handle, memcap)
 
         def _get_memcap(self):
             """Gets the value of the memory cap setting."""
-            return self.port._ctypes_get_struct(lib.fscc_get_memory_cap,
-                                                'i' * 2, (-1, -1))
+            memcap = FsccMemoryCap(-1, -1)
+            self.port._backend.get_memory_cap(self.port._handle, memcap)
+            return (memcap.input, memcap.output)
 
         def _set_imemcap(self, memcap):
             """Sets the value of the input memory cap setting."""
@@ -286,19 +293,21 @@ class Port(object):
             self.input = json['input']
             self.output = json['output']
 
-    def __init__(self, port_num, append_status=True, append_timestamp=True):
-        self._handle = ctypes.c_void_p()
-
-        e = lib.fscc_connect(port_num, ctypes.byref(self._handle))
-
-        Port._check_error(e)
-
-        self._handle = self._handle.value
+    def __init__(self, port_num, append_status=True, append_timestamp=True,
+                 backend=None):
+        self._backend = get_backend(backend)
+        self._handle = self._backend.connect(int(port_num))
         self._port_num = port_num
 
+        self._rx_view = memoryview(bytearray())
+        self._rx_buf = None
+        self._rx_pending = b''
+
         self.registers = Port.Registers(self)
         self.memory_cap = Port.MemoryCap(self)
 
+        self.refresh()
+
         if append_status is not None:
             self.append_status = append_status
 
@@ -307,234 +316,259 @@ class Port(object):
 
     def purge(self, tx=True, rx=True):
         """Removes unsent and/or unread data from the card."""
-        self._ctypes_set(lib.fscc_purge, bool(tx), bool(rx))
+        self._backend.purge(self._handle, bool(tx), bool(rx))
+
+        if rx:
+            self._rx_pending = b''
+
+    def refresh(self):
+        """Reloads the cached port settings from the driver.
+
+        Settings are cached when they are set through this object, so this is
+        only needed if something else has changed the port's settings.
+        """
+        get_setting = self._backend.get_setting
+
+        self._append_status = bool(get_setting(self._handle, 'append_status'))
+        self._append_timestamp = bool(get_setting(self._handle,
+                                                  'append_timestamp'))
+        self._ignore_timeout = bool(get_setting(self._handle,
+                                                'ignore_timeout'))
+        self._tx_modifiers = get_setting(self._handle, 'tx_modifiers')
+        self._rx_multiple = bool(get_setting(self._handle, 'rx_multiple'))
+        self._update_decoder()
+
+    def _update_decoder(self):
+        """Installs the trailer decoder for the current settings."""
+        self._decoder = trailer_decoder(self._append_status,
+                                        self._append_timestamp,
+                                        self._rx_multiple)
 
     def _set_append_status(self, status):
         """Sets the value of the append status setting."""
-        self._ctypes_set_bool(lib.fscc_enable_append_status,
-                              lib.fscc_disable_append_status,
-                              status)
+        self._backend.set_setting(self._handle, 'append_status', bool(status))
+        self._append_status = bool(status)
+        self._update_decoder()
 
     def _get_append_status(self):
         """Gets the value of the append status setting."""
-        return self._ctypes_get_bool(lib.fscc_get_append_status)
+        return self._append_status
 
     append_status = property(fset=_set_append_status, fget=_get_append_status)
 
     def _set_append_timestamp(self, status):
         """Sets the value of the append timestamp setting."""
-        self._ctypes_set_bool(lib.fscc_enable_append_timestamp,
-                              lib.fscc_disable_append_timestamp,
-                              status)
+        self._backend.set_setting(self._handle, 'append_timestamp',
+                                  bool(status))
+        self._append_timestamp = bool(status)
+        self._update_decoder()
 
     def _get_append_timestamp(self):
         """Gets the value of the append timestamp setting."""
-        return self._ctypes_get_bool(lib.fscc_get_append_timestamp)
+        return self._append_timestamp
 
     append_timestamp = property(fset=_set_append_timestamp,
                                 fget=_get_append_timestamp)
 
     def _set_ignore_timeout(self, status):
         """Sets the value of the ignore timeout setting."""
-        self._ctypes_set_bool(lib.fscc_enable_ignore_timeout,
-                              lib.fscc_disable_ignore_timeout,
-                              status)
+        self._backend.set_setting(self._handle, 'ignore_timeout', bool(status))
+        self._ignore_timeout = bool(status)
 
     def _get_ignore_timeout(self):
         """Gets the value of the ignore timeout setting."""
-        return self._ctypes_get_bool(lib.fscc_get_ignore_timeout)
+        return self._ignore_timeout
 
     ignore_timeout = property(fset=_set_ignore_timeout,
                               fget=_get_ignore_timeout)
 
     def _set_tx_modifiers(self, value):
         """Sets the value of the transmit modifiers setting."""
-        self._ctypes_set(lib.fscc_set_tx_modifiers, int(value))
+        self._backend.set_setting(self._handle, 'tx_modifiers', int(value))
+        self._tx_modifiers = int(value)
 
     def _get_tx_modifiers(self):
         """Gets the value of the transmit modifiers setting."""
-        return self._ctypes_get_uint(lib.fscc_get_tx_modifiers)
+        return self._tx_modifiers
 
     tx_modifiers = property(fset=_set_tx_modifiers, fget=_get_tx_modifiers)
 
     def _set_rx_multiple(self, status):
         """Sets the value of the rx multiple setting."""
-        self._ctypes_set_bool(lib.fscc_enable_rx_multiple,
-                              lib.fscc_disable_rx_multiple,
-                              status)
+        self._backend.set_setting(self._handle, 'rx_multiple', bool(status))
+        self._rx_multiple = bool(status)
+        self._update_decoder()
 
     def _get_rx_multiple(self):
-        """Gets the value of the ignore timeout setting."""
-        return self._ctypes_get_bool(lib.fscc_get_rx_multiple)
+        """Gets the value of the rx multiple setting."""
+        return self._rx_multiple
 
     rx_multiple = property(fset=_set_rx_multiple, fget=_get_rx_multiple)
 
     def _set_clock_frequency(self, frequency):
         """Sets the value of the clock frequency setting."""
-        self._ctypes_set(lib.fscc_set_clock_frequency, int(frequency))
+        self._backend.set_clock_frequency(self._handle, int(frequency))
 
     clock_frequency = property(fset=_set_clock_frequency)
 
-    @staticmethod
-    def _check_error(e):
-        if e == 0:
-            pass
-        elif e == FSCC_TIMEOUT:
-            raise TimeoutError()
-        elif e == FSCC_INCORRECT_MODE:
-            raise IncorrectModeError()
-        elif e == FSCC_BUFFER_TOO_SMALL:
-            raise BufferTooSmallError()
-        elif e == FSCC_PORT_NOT_FOUND:
-            raise PortNotFoundError()
-        elif e == FSCC_INVALID_ACCESS:
-            raise InvalidAccessError()
-        elif e == FSCC_INVALID_PARAMETER:
-            raise InvalidParameterError()
-        else:
-            raise OSError(e)
+    _check_error = staticmethod(check_error)
 
-    def _ctypes_set_bool(self, enable_func, disable_func, status):
-        func = enable_func if status else disable_func
-        e = func(self._handle)
-        Port._check_error(e)
+    def track_interrupts(self, interrupts, timeout=None):
+        """Tracks interrupts."""
+        return self._backend.track_interrupts(self._handle, interrupts,
+                                              timeout)
 
-    def _ctypes_get_bool(self, func):
-        return bool(self._ctypes_get_uint(func))
+    def _trailer_sizes(self):
+        """Gets the sizes of the status and timestamp appended to frames."""
+        return (self._decoder.status_size, self._decoder.timestamp_size)
 
-    def _ctypes_set(self, func, *args):
-        e = func(self._handle, *args)
-        Port._check_error(e)
+    def _split_frame(self, view, length):
+        """Splits a received frame into data, status and timestamp views."""
+        return self._decoder.split(view, length)
 
-    def _ctypes_get_uint(self, func):
-        status = ctypes.c_uint()
-        e = func(self._handle, ctypes.byref(status))
-        Port._check_error(e)
-        return status.value
+    def _read(self, buf, size, timeout):
+        """Reads a frame into a backend buffer and returns the size read."""
+        return self._backend.read(self._handle, buf, size, timeout)
 
-    def _ctypes_get_struct(self, func, fmt, initial):
-        buf = struct.pack(fmt, *initial)
-        e = func(self._handle, buf)
-        Port._check_error(e)
-        return struct.unpack(fmt, buf)
+    def readinto(self, buffer, timeout=None):
+        """Reads a frame into a writable buffer without allocating a copy.
 
-    def track_interrupts(self, interrupts, timeout=None):
-        """Tracks interrupts."""
-        matches = ctypes.c_uint()
+        Returns the number of bytes read along with memoryview slices of the
+        buffer holding the data, status and raw timestamp. The status and
+        timestamp are None when they aren't appended to the frame.
+        """
+        view = memoryview(buffer).cast('B')
+        size = len(view)
+        buf = self._backend.buffer(view)
 
-        if timeout:
-            e = lib.fscc_track_interrupts_with_timeout(
-                self._handle, interrupts, ctypes.byref(matches), int(timeout))
-        else:
-            e = lib.fscc_track_interrupts_with_blocking(
-                self._handle, interrupts, ctypes.byref(matches))
-
-        Port._check_error(e)
-
-        return matches.value
-
-    @staticmethod
-    def __parse_output_windows(append_status, append_timestamp, packet):
-        data, status, timestamp = packet, None, None
-
-        if (append_status and append_timestamp):
-            status = packet[-10:-8]
-            timestamp = struct.unpack('q', packet[-8:])[0]
-            data = packet[:-10]
-        elif (append_status):
-            status = packet[-2:]
-            data = packet[:-2]
-        elif (append_timestamp):
-            timestamp = struct.unpack('q', packet[-8:])[0]
-            data = packet[:-8]
-
-        if timestamp:
-            timestamp = timestamp / 10000000 - 11644473600
-
-        return (data, status, timestamp)
-
-    @staticmethod
-    def __parse_output_linux(append_status, append_timestamp, packet):
-        data, status, timestamp = packet, None, None
-
-        if ctypes.sizeof(ctypes.c_voidp) == 4:
-            if (append_status and append_timestamp):
-                status = packet[-10:-8]
-                timestamp = struct.unpack('ll', packet[-8:])
-                data = packet[:-10]
-            elif (append_status):
-                status = packet[-2:]
-                data = packet[:-2]
-            elif (append_timestamp):
-                timestamp = struct.unpack('ll', packet[-8:])
-                data = packet[:-8]
-
-            if timestamp:
-                timestamp = timestamp[0] + (float(timestamp[1]) / 1000000)
-        else:
-            if (append_status and append_timestamp):
-                status = packet[-18:-16]
-                timestamp = struct.unpack('ll', packet[-16:])
-                data = packet[:-18]
-            elif (append_status):
-                status = packet[-2:]
-                data = packet[:-2]
-            elif (append_timestamp):
-                timestamp = struct.unpack('ll', packet[-16:])
-                data = packet[:-16]
-
-            if timestamp:
-                timestamp = timestamp[0] + (float(timestamp[1]) / 1000000)
-
-        return (data, status, timestamp)
-
-    def __parse_output(self, packet):
-        if not packet:
-            return (None, None, None)
+        bytes_read = self._read(buf, size, timeout)
 
-        _append_status = self.append_status
-        _append_timestamp = self.append_timestamp
+        if not bytes_read:
+            return (0, None, None, None)
 
-        data, status, timestamp = packet, None, None
+        return (bytes_read,) + self._split_frame(view, bytes_read)
 
-        if not self.rx_multiple:
-            if os.name == 'nt':
-                data, status, timestamp = Port.__parse_output_windows(
-                    _append_status, _append_timestamp, packet)
-            else:
-                data, status, timestamp = Port.__parse_output_linux(
-                    _append_status, _append_timestamp, packet)
+    def _read_scratch(self, size, timeout):
+        """Reads into the port's reusable receive buffer."""
+        size = int(size)
+
+        if size > len(self._rx_view):
+            self._rx_view = memoryview(bytearray(size))
+            self._rx_buf = self._backend.buffer(self._rx_view)
+
+        bytes_read = self._read(self._rx_buf, size, timeout)
 
-        return (data, status, timestamp)
+        return self._rx_view, bytes_read
 
     def read(self, timeout=None, size=4096):
-        """Reads data from the card."""
-        bytes_read = ctypes.c_uint()
-        data = bytes(int(size))
-
-        if timeout:
-            e = lib.fscc_read_with_timeout(self._handle, data, int(size),
-                                           ctypes.byref(bytes_read),
-                                           int(timeout))
-        else:
-            e = lib.fscc_read_with_blocking(self._handle, data, int(size),
-                                            ctypes.byref(bytes_read))
+        """Reads data from the card.
 
-        Port._check_error(e)
+        Returns a Frame that unpacks to (data, status, timestamp), the status
+        and timestamp are only decoded when they are accessed.
+        """
+        view, bytes_read = self._read_scratch(size, timeout)
 
-        return self.__parse_output(data[:bytes_read.value])
+        if not bytes_read:
+            return (None, None, None)
 
-    def write(self, data):
-        bytes_written = ctypes.c_uint()
-        e = lib.fscc_write_with_blocking(self._handle, data, len(data),
-                                         ctypes.byref(bytes_written))
+        return self._decoder.frame(view, bytes_read)
+
+    def read_frames(self, max_bytes=65536, timeout=None, frame_size=None):
+        """Reads a batch of frames from the card.
+
+        With rx_multiple enabled a single read returns as many whole frames as
+        fit in max_bytes. The driver doesn't mark where each frame ends, so
+        frame_size (not counting the appended status and timestamp) is needed
+        to split them apart. Otherwise the batch holds a single frame.
 
-        Port._check_error(e)
+        If a read ends partway through a frame the rest of the read is kept
+        and returned at the start of the next batch.
+        """
+        status_size = STATUS_SIZE if self._append_status else 0
+        timestamp_size = TIMESTAMP_SIZE if self._append_timestamp else 0
 
-        return bytes_written.value
+        if not self._rx_multiple:
+            frame_size = None
+        elif frame_size is None:
+            raise ValueError('frame_size is required with rx_multiple')
+        elif int(frame_size) <= 0:
+            raise ValueError('frame_size must be positive')
+
+        view, bytes_read = self._read_scratch(max_bytes, timeout)
+        buffer = view[:bytes_read].tobytes()
+
+        if frame_size is not None:
+            if self._rx_pending:
+                buffer = self._rx_pending + buffer
+
+            record_size = int(frame_size) + status_size + timestamp_size
+            whole = len(buffer) - len(buffer) % record_size
+            buffer, self._rx_pending = buffer[:whole], buffer[whole:]
+
+        return FrameBatch.from_buffer(buffer, frame_size, status_size,
+                                      timestamp_size)
+
+    def start_receiver(self, capacity=1024, slot_size=4096):
+        """Starts draining frames into a ring buffer in the background.
+
+        The frames are read with get() and get_batch() on the returned
+        Receiver. slot_size is the largest frame, including the appended
+        status and timestamp, that can be received.
+        """
+        receiver = Receiver(self, capacity, slot_size)
+        receiver.start()
+        return receiver
+
+    def write(self, data):
+        """Writes a frame to the card."""
+        return self._backend.write(self._handle, data)
+
+    def write_many(self, frames):
+        """Writes each of the frames to the card.
+
+        Returns an array of the number of bytes written for each frame. If a
+        write fails (with an OSError or a library error like
+        InvalidParameterError) the remaining frames aren't written and
+        PartialWriteError is raised with the frames that were written.
+        """
+        write, handle = self._backend.write, self._handle
+        written = array('L')
+
+        try:
+            for frame in frames:
+                written.append(write(handle, frame))
+        except (OSError, ValueError) as e:
+            raise PartialWriteError(written, e) from e
+
+        return written
+
+    def write_buffer(self, buffer, offsets):
+        """Writes frames stored back to back in a single buffer.
+
+        Each frame starts at its offset and ends at the next frame's offset,
+        the last frame ends at the end of the buffer. Each frame is passed to
+        the backend as a slice of the buffer, without copying the whole
+        buffer first. Returns and raises the same as write_many().
+        """
+        view = memoryview(buffer).cast('B')
+        write, handle = self._backend.write, self._handle
+        ends = list(offsets[1:]) + [len(view)]
+        written = array('L')
+
+        try:
+            for start, end in zip(offsets, ends):
+                written.append(write(handle, view[start:end]))
+        except (OSError, ValueError) as e:
+            raise PartialWriteError(written, e) from e
+
+        return written
+
+    def fileno(self):
+        """Gets the port's file descriptor for use with select and poll."""
+        return self._backend.fileno(self._handle)
 
     def close(self):
-        lib.fscc_disconnect(self._handle)
+        self._backend.disconnect(self._handle)
 
     def _to_json(self):
         return {
@@ -571,6 +605,9 @@ class Port(object):
                                               self.append_timestamp)
 
 
+Port.Registers._build_tables()
+
+
 if __name__ == '__main__':
     p = Port(0)
 
@@ -0,0 +1,178 @@
+"""
+    MIT License
+
+Copyright (c) [2019] [Commtech]
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import threading
+from array import array
+
+
+class Receiver(object):
+    """Drains a port into a ring of preallocated frame slots.
+
+    A background thread keeps reading frames from the port so the driver's
+    input memory cap doesn't fill up while the consumer is busy. If the ring
+    is full the frame is still read from the port but is dropped and counted.
+    """
+
+    def __init__(self, port, capacity=1024, slot_size=4096,
+                 poll_interval=100):
+        self.port = port
+        self.capacity = int(capacity)
+        self.slot_size = int(slot_size)
+        self.poll_interval = poll_interval
+
+        view = memoryview(bytearray(self.capacity * self.slot_size))
+        self._slots = [view[i * self.slot_size:(i + 1) * self.slot_size]
+                       for i in range(self.capacity)]
+        self._lengths = array('L', [0]) * self.capacity
+        self._spare = memoryview(bytearray(self.slot_size))
+
+        self._head = 0
+        self._count = 0
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+        self._error = None
+
+        self.frames_received = 0
+        self.bytes_received = 0
+        self.frames_dropped = 0
+        self.high_water_mark = 0
+
+    def start(self):
+        """Starts receiving frames in the background."""
+        if self._running:
+            return
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run,
+                                        name='fscc-receiver-{}'.format(
+                                            self.port),
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops receiving frames, the queued frames can still be read."""
+        self._running = False
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        try:
+            while self._running:
+                self._receive()
+        except Exception as e:
+            self._error = e
+            self._running = False
+        finally:
+            with self._condition:
+                self._condition.notify_all()
+
+    def _receive(self):
+        with self._condition:
+            full = self._count == self.capacity
+            tail = (self._head + self._count) % self.capacity
+
+        slot = self._spare if full else self._slots[tail]
+        bytes_read = self.port.readinto(slot, self.poll_interval)[0]
+
+        if not bytes_read:
+            return
+
+        with self._condition:
+            self.frames_received += 1
+            self.bytes_received += bytes_read
+
+            if full:
+                if self._count == self.capacity:
+                    self.frames_dropped += 1
+                    return
+
+                # The consumer made room while the frame was being read
+                tail = (self._head + self._count) % self.capacity
+                self._slots[tail][:bytes_read] = slot[:bytes_read]
+
+            self._lengths[tail] = bytes_read
+            self._count += 1
+            self.high_water_mark = max(self.high_water_mark, self._count)
+            self._condition.notify()
+
+    def _pop(self):
+        slot = self._slots[self._head]
+        frame = self.port._decoder.frame(slot, self._lengths[self._head])
+
+        self._head = (self._head + 1) % self.capacity
+        self._count -= 1
+
+        return frame
+
+    def _wait(self, timeout):
+        """Waits for a queued frame, returns False if there aren't any."""
+        if timeout is not None:
+            timeout = timeout / 1000
+
+        self._condition.wait_for(
+            lambda: self._count or not self._running, timeout)
+
+        if not self._count and self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+        return bool(self._count)
+
+    def get(self, timeout=None):
+        """Gets the next frame, waiting up to timeout milliseconds.
+
+        Returns (None, None, None) if no frame was received in time.
+        """
+        with self._condition:
+            if not self._wait(timeout):
+                return (None, None, None)
+
+            return self._pop()
+
+    def get_batch(self, max_frames=None, timeout=None):
+        """Gets the queued frames, waiting up to timeout milliseconds."""
+        with self._condition:
+            if not self._wait(timeout):
+                return []
+
+            count = self._count
+
+            if max_frames is not None:
+                count = min(count, max_frames)
+
+            return [self._pop() for _ in range(count)]
+
+    def __len__(self):
+        return self._count
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
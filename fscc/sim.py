@@ -0,0 +1,356 @@
+"""
+    MIT License
+
+Copyright (c) [2019] [Commtech]
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import collections
+import errno
+import heapq
+import io
+import os
+import struct
+import threading
+import time
+
+from fscc import backend
+from fscc.errors import *
+from fscc.port import FSCC_UPDATE_VALUE, Port
+
+CLOCK_FREQUENCY = 18432000
+
+# The status appended to every simulated frame
+STATUS = b'\x04\x00'
+
+# Opening flag, CRC and closing flag sent with each HDLC frame
+FRAME_OVERHEAD = 4
+
+BGR = Port.Registers.register_indexes['BGR']
+
+
+def _timestamp(seconds):
+    """Encodes a time the same way the driver appends it to frames."""
+    if os.name == 'nt':
+        return struct.pack('q', int((seconds + 11644473600) * 10000000))
+    else:
+        microseconds = int(seconds * 1000000)
+        return struct.pack('ll', microseconds // 1000000,
+                           microseconds % 1000000)
+
+
+class SimPort(object):
+    """The state the driver keeps for a single simulated port."""
+
+    def __init__(self, port_num, clock_frequency=CLOCK_FREQUENCY):
+        self.port_num = port_num
+        self.peer = self
+        self.settings = dict(append_status=0, append_timestamp=0,
+                             ignore_timeout=0, rx_multiple=0,
+                             tx_modifiers=0)
+        self.registers = [0] * 24
+        self.memory_cap = [1000000, 1000000]
+        self.clock_frequency = clock_frequency
+
+        self.rx = collections.deque()
+        self.rx_bytes = 0
+        self.tx_bytes = 0
+        self.line_free_at = 0.0
+
+        self.frames_dropped = 0
+        self._pipe = None
+
+    @property
+    def bitrate(self):
+        """The bit rate set by the clock frequency and BGR register."""
+        return self.clock_frequency / (self.registers[BGR] + 1)
+
+    def fileno(self):
+        """Gets a descriptor that is readable while frames are waiting."""
+        if self._pipe is None:
+            self._pipe = os.pipe()
+            os.set_blocking(self._pipe[1], False)
+
+            if self.rx:
+                os.write(self._pipe[1], b'\0')
+
+        return self._pipe[0]
+
+    def receive(self, data, timestamp):
+        """Queues a frame that finished arriving on the line."""
+        if self.rx_bytes + len(data) > self.memory_cap[0]:
+            self.frames_dropped += 1
+            return
+
+        if not self.rx and self._pipe is not None:
+            os.write(self._pipe[1], b'\0')
+
+        self.rx.append((data, timestamp))
+        self.rx_bytes += len(data)
+
+    def pop(self):
+        data, timestamp = self.rx.popleft()
+        self.rx_bytes -= len(data)
+
+        if not self.rx and self._pipe is not None:
+            os.read(self._pipe[0], 1)
+
+        return data, timestamp
+
+    def trailer(self, timestamp):
+        trailer = b''
+
+        if self.settings['append_status']:
+            trailer += STATUS
+
+        if self.settings['append_timestamp']:
+            trailer += _timestamp(timestamp)
+
+        return trailer
+
+    def purge_rx(self):
+        while self.rx:
+            self.pop()
+
+
+class SimBackend(object):
+    """Simulated ports that don't need a card or driver.
+
+    Each port loops back to itself unless it's one of the given pairs, which
+    are connected to each other. Frames take as long to arrive as they would
+    on the line at the bit rate set by the clock frequency and BGR register,
+    unless pacing is turned off.
+    """
+    name = 'sim'
+
+    class Handle(object):
+        """A connection to a simulated port."""
+
+        def __init__(self, port_num, port):
+            self.port_num = port_num
+            self.port = port
+
+    def __init__(self, ports=2, pairs=(), pacing=True,
+                 clock_frequency=CLOCK_FREQUENCY):
+        self.pacing = pacing
+        self.ports = [SimPort(i, clock_frequency) for i in range(ports)]
+
+        for a, b in pairs:
+            self.ports[a].peer = self.ports[b]
+            self.ports[b].peer = self.ports[a]
+
+        self._condition = threading.Condition()
+        self._in_flight = []
+        self._sequence = 0
+        self._wire = None
+
+    def connect(self, port_num):
+        if not 0 <= port_num < len(self.ports):
+            raise PortNotFoundError(port_num)
+
+        return SimBackend.Handle(port_num, self.ports[port_num])
+
+    def disconnect(self, handle):
+        pass
+
+    def fileno(self, handle):
+        if os.name == 'nt':
+            raise io.UnsupportedOperation('fileno')
+
+        with self._condition:
+            return handle.port.fileno()
+
+    def get_setting(self, handle, name):
+        return handle.port.settings[name]
+
+    def set_setting(self, handle, name, value):
+        handle.port.settings[name] = int(value)
+
+    def get_memory_cap(self, handle, memcap):
+        memcap.input, memcap.output = handle.port.memory_cap
+
+    def set_memory_cap(self, handle, memcap):
+        for i, value in enumerate((memcap.input, memcap.output)):
+            if value >= 0:
+                handle.port.memory_cap[i] = value
+
+    def get_registers(self, handle, registers):
+        for i, value in enumerate(handle.port.registers):
+            if registers[i] == FSCC_UPDATE_VALUE:
+                registers[i] = value
+
+    def set_registers(self, handle, registers):
+        for i, value in enumerate(registers):
+            if value >= 0:
+                handle.port.registers[i] = value
+
+    def set_clock_frequency(self, handle, frequency):
+        handle.port.clock_frequency = int(frequency)
+
+    def purge(self, handle, tx, rx):
+        with self._condition:
+            if tx:
+                self._in_flight = [f for f in self._in_flight
+                                   if f[2] is not handle.port]
+                heapq.heapify(self._in_flight)
+                handle.port.tx_bytes = 0
+                handle.port.line_free_at = 0.0
+
+            if rx:
+                handle.port.purge_rx()
+
+            self._condition.notify_all()
+
+    def track_interrupts(self, handle, interrupts, timeout=None):
+        if not timeout:
+            raise OSError(errno.EOPNOTSUPP,
+                          'Interrupts are not simulated')
+
+        time.sleep(timeout / 1000)
+        return 0
+
+    def buffer(self, view):
+        """Gets a buffer that can be passed to read() for a memoryview."""
+        return view
+
+    def _wait(self, port, deadline):
+        """Waits for a frame to arrive, returns False on a timeout."""
+        while not port.rx:
+            remaining = None if deadline is None else deadline - time.time()
+
+            if remaining is not None and remaining <= 0:
+                return False
+
+            self._condition.wait(remaining)
+
+        return True
+
+    def read(self, handle, buf, size, timeout=None):
+        port = handle.port
+        deadline = time.time() + timeout / 1000 if timeout else None
+
+        with self._condition:
+            if not self._wait(port, deadline):
+                return 0
+
+            size = min(size, len(buf))
+            bytes_read = 0
+
+            while port.rx:
+                data, timestamp = port.rx[0]
+                frame = data + port.trailer(timestamp)
+
+                if bytes_read + len(frame) > size:
+                    if not bytes_read:
+                        raise BufferTooSmallError()
+                    break
+
+                port.pop()
+                buf[bytes_read:bytes_read + len(frame)] = frame
+                bytes_read += len(frame)
+
+                if not port.settings['rx_multiple']:
+                    break
+
+            return bytes_read
+
+    def write(self, handle, data):
+        port = handle.port
+        data = bytes(data)
+
+        if len(data) > port.memory_cap[1]:
+            raise BufferTooSmallError()
+
+        with self._condition:
+            now = time.time()
+
+            if not self.pacing:
+                port.peer.receive(data, now)
+                self._condition.notify_all()
+                return len(data)
+
+            # Like the driver, only block once the output memory cap is full
+            while port.tx_bytes + len(data) > port.memory_cap[1]:
+                self._condition.wait()
+
+            now = time.time()
+            bits = 8 * (len(data) + FRAME_OVERHEAD)
+            arrival = max(now, port.line_free_at) + bits / port.bitrate
+            port.line_free_at = arrival
+            port.tx_bytes += len(data)
+
+            heapq.heappush(self._in_flight,
+                           (arrival, self._sequence, port, data))
+            self._sequence += 1
+
+            if self._wire is None:
+                self._wire = threading.Thread(target=self._run_wire,
+                                              name='fscc-sim', daemon=True)
+                self._wire.start()
+
+            self._condition.notify_all()
+
+        return len(data)
+
+    def _run_wire(self):
+        """Delivers frames once they have finished crossing the line."""
+        with self._condition:
+            while True:
+                now = time.time()
+
+                while self._in_flight and self._in_flight[0][0] <= now:
+                    arrival, _, port, data = heapq.heappop(self._in_flight)
+                    port.tx_bytes -= len(data)
+                    port.peer.receive(data, arrival)
+                    self._condition.notify_all()
+
+                if self._in_flight:
+                    self._condition.wait(self._in_flight[0][0] - now)
+                else:
+                    self._condition.wait()
+
+
+_shared = None
+
+
+def shared_backend():
+    """Gets the simulator used by ports opened with backend='sim'."""
+    global _shared
+
+    if _shared is None:
+        _shared = SimBackend()
+
+    return _shared
+
+
+def _forget_shared():
+    global _shared
+
+    if _shared is not None and backend._default_backend is _shared:
+        backend._default_backend = None
+
+    _shared = None
+
+
+# A forked process gets its own simulator rather than a copy of the parent's
+# without its thread and sharing its pipes.
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_shared)
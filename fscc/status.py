@@ -0,0 +1,214 @@
+"""
+    MIT License
+
+Copyright (c) [2019] [Commtech]
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import itertools
+import sys
+from array import array
+
+from fscc.fields import Field, Register
+
+# The receive status bits appended to each frame
+STATUS = Register('STATUS', [
+    Field('rab', 0),  # The frame was aborted
+    Field('rdo', 1),  # Receive data overflow, bytes were lost
+    Field('crc', 2),  # The frame's CRC was correct
+])
+
+RAB = 0x0001
+RDO = 0x0002
+CRC_OK = 0x0004
+
+# A frame is good if none of the error bits and all of the OK bits are set
+ERROR_FLAGS = RAB | RDO
+OK_FLAGS = CRC_OK
+
+# Every flag is in the low byte of the status word, so a batch of status
+# words is decoded by translating their low bytes through 256 byte tables
+_LOW_BYTE = 0 if sys.byteorder == 'little' else 1
+
+
+def _table(test):
+    return bytes(1 if test(value) else 0 for value in range(256))
+
+
+_GOOD = _table(lambda value: not value & ERROR_FLAGS and
+               value & OK_FLAGS == OK_FLAGS)
+_FLAGS = dict((field.name, _table(lambda value, field=field:
+                                  field.decode(value)))
+              for field in STATUS)
+
+
+def _words(statuses):
+    """Gets the status words of a FrameBatch, capture Reader, column or
+    sequence as an array('H') or NumPy array.
+    """
+    statuses = getattr(statuses, 'statuses', statuses)
+
+    if statuses is None:
+        raise ValueError('the status is not appended to these frames')
+
+    if hasattr(statuses, 'dtype'):
+        return statuses
+
+    if hasattr(statuses, 'array'):
+        statuses = statuses.array()
+
+    if not isinstance(statuses, array) or statuses.typecode != 'H':
+        statuses = array('H', statuses)
+
+    return statuses
+
+
+def _low_bytes(words):
+    return words.tobytes()[_LOW_BYTE::2]
+
+
+def decode(statuses):
+    """Gets every status flag of a batch of status words.
+
+    Returns a dict of flag name to an array of 0 or 1 for each frame, NumPy
+    arrays are decoded into NumPy arrays.
+    """
+    words = _words(statuses)
+
+    if hasattr(words, 'dtype'):
+        return STATUS.decode_many(words)
+
+    low = _low_bytes(words)
+    return dict((name, array('B', low.translate(table)))
+                for name, table in _FLAGS.items())
+
+
+def good_mask(statuses):
+    """Gets a mask of the frames received without errors.
+
+    Returns bytes of 0 or 1 for each frame (or a NumPy bool array for a
+    NumPy array of status words), which can be used with
+    itertools.compress() or summed to count the good frames.
+    """
+    words = _words(statuses)
+
+    if hasattr(words, 'dtype'):
+        return ((words & ERROR_FLAGS) == 0) & \
+            ((words & OK_FLAGS) == OK_FLAGS)
+
+    return _low_bytes(words).translate(_GOOD)
+
+
+def good_frames(batch):
+    """Gets a FrameBatch of the frames received without errors."""
+    return batch.take(itertools.compress(range(len(batch)),
+                                         good_mask(batch)))
+
+
+class ErrorCounters(object):
+    """Running counts of the frames received by a port and their errors."""
+
+    __slots__ = ('frames', 'good', 'aborted', 'overflows', 'crc_errors')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.frames = 0
+        self.good = 0
+        self.aborted = 0
+        self.overflows = 0
+        self.crc_errors = 0
+
+    @property
+    def errors(self):
+        """Gets the number of frames received with errors."""
+        return self.frames - self.good
+
+    def update(self, statuses):
+        """Counts a batch of status words and returns their good mask."""
+        words = _words(statuses)
+
+        if hasattr(words, 'dtype'):
+            mask = good_mask(words)
+            self.good += int(mask.sum())
+            self.aborted += int(((words & RAB) != 0).sum())
+            self.overflows += int(((words & RDO) != 0).sum())
+            self.crc_errors += int(((words & CRC_OK) == 0).sum())
+        else:
+            low = _low_bytes(words)
+            mask = low.translate(_GOOD)
+            self.good += mask.count(1)
+            self.aborted += low.translate(_FLAGS['rab']).count(1)
+            self.overflows += low.translate(_FLAGS['rdo']).count(1)
+            self.crc_errors += low.translate(_FLAGS['crc']).count(0)
+
+        self.frames += len(words)
+
+        return mask
+
+    def __repr__(self):
+        return ('<fscc.status.ErrorCounters frames={} good={} aborted={} '
+                'overflows={} crc_errors={}>').format(
+                    self.frames, self.good, self.aborted, self.overflows,
+                    self.crc_errors)
+
+
+class StatusMonitor(object):
+    """Running error counters for each port frames are received from."""
+
+    def __init__(self):
+        self.counters = {}
+
+    def update(self, port, statuses):
+        """Counts a batch of status words from a port and returns their good
+        mask.
+        """
+        try:
+            counters = self.counters[port]
+        except KeyError:
+            counters = self.counters[port] = ErrorCounters()
+
+        return counters.update(statuses)
+
+    def totals(self):
+        """Gets the counts of every port added together."""
+        totals = ErrorCounters()
+
+        for counters in self.counters.values():
+            for name in ErrorCounters.__slots__:
+                setattr(totals, name,
+                        getattr(totals, name) + getattr(counters, name))
+
+        return totals
+
+    def reset(self):
+        for counters in self.counters.values():
+            counters.reset()
+
+    def __getitem__(self, port):
+        return self.counters[port]
+
+    def __iter__(self):
+        return iter(self.counters.items())
+
+    def __len__(self):
+        return len(self.counters)
@@ -1,6 +1,40 @@
+import asyncio
+import os
+import struct
+import tempfile
+import threading
+import time
+import types
 import unittest
 
-from fscc import Port
+from fscc import (Port, PortGroup, aio, capture, clock, crc, fields, pcap,
+                  status)
+from fscc.backend import CfsccBackend, LinuxBackend
+from fscc.cluster import Cluster
+from fscc.errors import InvalidParameterError, PartialWriteError
+from fscc.frame import (FILETIME_EPOCH, STATUS_SIZE, TIMESTAMP_FORMAT,
+                        TIMESTAMP_SIZE, FrameBatch, status_word)
+from fscc.sim import SimBackend
+
+# Timestamps that can't be held exactly by a float of seconds
+EXACT_TIMESTAMPS = (1760000000123457000, 999999000)
+
+
+def appended_timestamp(ns):
+    """Packs nanoseconds like the driver appends a timestamp."""
+    if os.name == 'nt':
+        return struct.pack(TIMESTAMP_FORMAT, ns // 100 + FILETIME_EPOCH)
+
+    return struct.pack(TIMESTAMP_FORMAT, ns // 1000000000,
+                       ns % 1000000000 // 1000)
+
+
+def exact_batch():
+    """Gets a batch of two frames with EXACT_TIMESTAMPS appended."""
+    return FrameBatch.from_buffer(b''.join(
+        data + b'\x04\x00' + appended_timestamp(ns) for data, ns in
+        zip((b'UU', b'VV'), EXACT_TIMESTAMPS)), 2, STATUS_SIZE,
+        TIMESTAMP_SIZE)
 
 
 class FsccTestCase(unittest.TestCase):
@@ -42,6 +76,11 @@ class AttrTestCase(FsccTestCase):
     def test_rx_multiple(self):
         self.boolean_attr_test('rx_multiple')
 
+    def test_refresh(self):
+        self.port.rx_multiple = True
+        self.port.refresh()
+        self.assertTrue(self.port.rx_multiple)
+
     def test_imemcap(self):
             # Test the attribute exists
             self.port.input_memory_cap
@@ -105,6 +144,505 @@ class RWTestCase(FsccTestCase):
         self.assertEqual(len(data[1]), 2)
         self.assertIsNotNone(data[2])
 
+    def test_readinto(self):
+        self.port.write(b'U')
+        self.port.append_status = True
+        self.port.append_timestamp = False
+        buf = bytearray(4096)
+        bytes_read, data, status, timestamp = self.port.readinto(buf)
+        self.assertEqual(bytes_read, 3)
+        self.assertEqual(data, b'U')
+        self.assertEqual(len(status), 2)
+        self.assertIsNone(timestamp)
+
+    def test_write_many(self):
+        self.port.append_status = False
+        self.port.append_timestamp = False
+        written = self.port.write_many([b'U', b'VV'])
+        self.assertEqual(list(written), [1, 2])
+        self.assertEqual(self.port.read()[0], b'U')
+        self.assertEqual(self.port.read()[0], b'VV')
+
+    def test_write_buffer(self):
+        self.port.append_status = False
+        self.port.append_timestamp = False
+        written = self.port.write_buffer(b'UVV', [0, 1])
+        self.assertEqual(list(written), [1, 2])
+        self.assertEqual(self.port.read()[0], b'U')
+        self.assertEqual(self.port.read()[0], b'VV')
+
+    def test_write_many_error(self):
+        write = self.port._backend.write
+
+        def fail_second(handle, data):
+            if bytes(data) == b'VV':
+                raise InvalidParameterError()
+
+            return write(handle, data)
+
+        self.port._backend.write = fail_second
+
+        for frames in ([b'U', b'VV', b'W'], None):
+            with self.assertRaises(PartialWriteError) as context:
+                if frames is None:
+                    self.port.write_buffer(memoryview(b'UVVW'), [0, 1, 3])
+                else:
+                    self.port.write_many(frames)
+
+            self.assertEqual(list(context.exception.written), [1])
+            self.assertIsInstance(context.exception.error,
+                                  InvalidParameterError)
+
+    def test_read_frames(self):
+        self.port.append_status = True
+        self.port.append_timestamp = True
+        self.port.rx_multiple = True
+        self.port.write(b'UU')
+        self.port.write(b'VV')
+        frames = self.port.read_frames(frame_size=2)
+        self.assertEqual([data for data, _, _ in frames], [b'UU', b'VV'])
+        self.assertEqual(len(frames[0][1]), 2)
+        self.assertIsNotNone(frames[0][2])
+
+    def test_read_frames_remainder(self):
+        self.port.append_status = True
+        self.port.append_timestamp = True
+        self.port.rx_multiple = True
+        self.port.write(b'UUU')
+        self.port.write(b'V')
+        with self.assertRaises(ValueError):
+            self.port.read_frames()
+        record_size = 2 + STATUS_SIZE + TIMESTAMP_SIZE
+        first = self.port.read_frames(record_size + 1, frame_size=2)
+        second = self.port.read_frames(frame_size=2)
+        self.assertEqual((len(first), len(second)), (1, 1))
+        self.assertEqual(first[0].data, b'UU')
+
+    def test_frame(self):
+        self.port.append_status = True
+        self.port.append_timestamp = True
+        self.port.write(b'UU')
+        frame = self.port.read()
+        data, status, timestamp = frame
+        self.assertEqual(frame.data, b'UU')
+        self.assertEqual(bytes(frame.view), b'UU')
+        self.assertEqual(frame, (data, status, timestamp))
+        self.assertEqual(frame[1], frame.status)
+        self.assertEqual(frame[-1], timestamp)
+        self.assertEqual(frame[:2], (data, status))
+        self.assertRaises(IndexError, lambda: frame[3])
+        self.assertEqual(frame.timestamp_ns // 1000,
+                         int(round(timestamp * 1000000)))
+
+    def test_frame_batch(self):
+        self.port.append_status = True
+        self.port.append_timestamp = True
+        self.port.rx_multiple = True
+        self.port.write(b'UU')
+        self.port.write(b'VV')
+        first = self.port.read_frames(frame_size=2)
+        self.port.write(b'WW')
+        frames = first + self.port.read_frames(frame_size=2)
+        self.assertEqual([frame.data for frame in frames],
+                         [b'UU', b'VV', b'WW'])
+        self.assertEqual([frame.data for frame in frames[1:]], [b'VV', b'WW'])
+        self.assertEqual(list(frames.statuses),
+                         [status_word(frame.status) for frame in frames])
+        self.assertEqual(list(frames.timestamps),
+                         [frame.timestamp_ns for frame in frames])
+        self.assertEqual(len(frames.filter_status(frames.statuses[0])), 3)
+        self.assertEqual(len(frames.filter_status(clear_flags=0xffff)), 0)
+
+    def test_frame_batch_take(self):
+        batch = exact_batch()
+
+        for indices in ([1, 1], [1, 0], [0, 1, 1, 0]):
+            frames = batch.take(indices)
+            self.assertEqual(list(frames.statuses), [4] * len(indices))
+            self.assertEqual(list(frames.timestamps),
+                             [EXACT_TIMESTAMPS[i] for i in indices])
+            self.assertEqual([bytes(view) for view in frames.views()],
+                             [(b'UU', b'VV')[i] for i in indices])
+
+    def test_frame_batch_from_buffer(self):
+        frames = FrameBatch.from_buffer(b'UU' + bytes(STATUS_SIZE), None,
+                                        STATUS_SIZE)
+        self.assertEqual([frame.data for frame in frames], [b'UU'])
+        self.assertRaises(ValueError, FrameBatch.from_buffer, b'U', None,
+                          STATUS_SIZE)
+        self.assertRaises(ValueError, FrameBatch.from_buffer, b'UU', -1)
+
+    def test_decoder(self):
+        self.port.append_status = True
+        self.port.append_timestamp = False
+        decoder = self.port._decoder
+        self.assertEqual((decoder.status_size, decoder.timestamp_size),
+                         (STATUS_SIZE, 0))
+        self.port.append_timestamp = True
+        self.assertIsNot(self.port._decoder, decoder)
+        self.assertEqual(self.port._decoder.size,
+                         STATUS_SIZE + TIMESTAMP_SIZE)
+        self.port.rx_multiple = True
+        self.assertEqual(self.port._decoder.size, 0)
+
+    def test_timestamps(self):
+        self.port.append_timestamp = True
+        self.port.rx_multiple = True
+        self.port.write(b'UU')
+        self.port.write(b'VV')
+        frames = self.port.read_frames(frame_size=2)
+        timestamps = frames.timestamps
+        self.assertEqual(len(timestamps), 2)
+        self.assertEqual(timestamps[0] // 1000,
+                         int(round(frames[0][2] * 1000000)))
+
+
+class ReceiverTestCase(FsccTestCase):
+    def test_receiver(self):
+        receiver = self.port.start_receiver(capacity=2)
+
+        try:
+            self.port.write(b'U')
+            data = receiver.get(1000)
+        finally:
+            receiver.stop()
+
+        self.assertEqual(data[0], b'U')
+        self.assertEqual(receiver.frames_received, 1)
+        self.assertEqual(receiver.frames_dropped, 0)
+
+
+class PortGroupTestCase(FsccTestCase):
+    def test_read_ready(self):
+        with PortGroup([self.port]) as group:
+            self.assertEqual(group.poll(0), [])
+            self.port.write(b'U')
+            self.assertEqual(group.poll(1000), [self.port])
+            (port, frames), = group.read_ready(1000)
+
+        self.assertIs(port, self.port)
+        self.assertEqual(frames[0][0], b'U')
+
+
+class StatusTestCase(unittest.TestCase):
+    def test_decode(self):
+        flags = status.decode([0x0004, 0x0005, 0x0002])
+        self.assertEqual(list(flags['rab']), [0, 1, 0])
+        self.assertEqual(list(flags['rdo']), [0, 0, 1])
+        self.assertEqual(list(flags['crc']), [1, 1, 0])
+
+    def test_counters(self):
+        monitor = status.StatusMonitor()
+        mask = monitor.update(0, [0x0004, 0x0005, 0x0000, 0x0104])
+        monitor.update(1, [0x0006])
+        self.assertEqual(list(mask), [1, 0, 0, 1])
+        self.assertEqual(monitor[0].good, 2)
+        self.assertEqual(monitor[0].aborted, 1)
+        self.assertEqual(monitor[0].crc_errors, 1)
+        totals = monitor.totals()
+        self.assertEqual((totals.frames, totals.errors, totals.overflows),
+                         (5, 3, 1))
+
+
+class CrcTestCase(unittest.TestCase):
+    def test_check_values(self):
+        self.assertEqual(crc.CRC_CCITT.compute(b'123456789'), 0x906e)
+        self.assertEqual(crc.CRC32.compute(b'123456789'), 0xcbf43926)
+        table = crc.Crc('CRC-16/CCITT', 16, 0x1021, 0xffff, 0xffff)
+        self.assertEqual(table.compute(b'123456789'), 0x906e)
+
+    def test_check_batch(self):
+        frames = crc.CRC_CCITT.append_many([b'UU', b'VV', b'WW'])
+        frames[1] = b'VX' + frames[1][2:]
+        batch = FrameBatch.from_buffer(b''.join(frames), 4)
+        self.assertEqual(crc.CRC_CCITT.check_batch(batch), b'\x01\x00\x01')
+        self.assertEqual(crc.CRC_CCITT.check_batch(frames),
+                         b'\x01\x00\x01')
+        self.assertTrue(crc.CRC32.check(crc.CRC32.append(b'UU')))
+
+
+class CaptureTestCase(FsccTestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'test.cap')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_recorder(self):
+        with capture.Recorder(self.path) as recorder:
+            recorder.write(b'UU', b'\x04\x00', 1000)
+            self.port.write(b'U')
+            self.assertEqual(recorder.read_from(self.port, 1000),
+                             1 + STATUS_SIZE + TIMESTAMP_SIZE)
+
+        self.assertEqual(recorder.frames, 2)
+        self.assertEqual(os.path.getsize(capture.index_path(self.path)),
+                         capture.FILE_HEADER.size +
+                         2 * capture.INDEX_ENTRY.size)
+
+
+    def test_short_writes(self):
+        class ShortFile(object):
+            def __init__(self, file):
+                self.file = file
+
+            def write(self, data):
+                return self.file.write(data[:3])
+
+            def close(self):
+                self.file.close()
+
+        path = self.path + '.pcapng'
+
+        with capture.Recorder(self.path) as recorder, \
+                pcap.Writer(path) as writer:
+            recorder._file = ShortFile(recorder._file)
+            recorder._index = ShortFile(recorder._index)
+            writer._file = ShortFile(writer._file)
+
+            recorder.write(b'UUUU', b'\x04\x00', 1000)
+            writer.write(b'UUUU', b'\x04\x00', 1000)
+
+        with capture.Reader(self.path) as reader:
+            self.assertEqual(bytes(reader[0].data), b'UUUU')
+
+        with pcap.Reader(path) as reader:
+            self.assertEqual(bytes(next(iter(reader)).data), b'UUUU')
+
+    def test_recover(self):
+        with capture.Recorder(self.path) as recorder:
+            recorder.write(b'U', None, 1000)
+
+        # Records written without their index entries, then a partial record
+        recorder = capture.Recorder(self.path)
+        recorder.write(b'VV', None, 2000)
+        recorder._entries = bytearray()
+        recorder.flush()
+        recorder._file.write(b'\x05\x00')
+        recorder._file.close()
+        recorder._index.close()
+
+        with capture.Recorder(self.path) as recorder:
+            recorder.write(b'WWW', None, 3000)
+
+        with capture.Reader(self.path) as reader:
+            self.assertEqual(list(reader.timestamps), [1000, 2000, 3000])
+            self.assertEqual([bytes(record.data) for record in reader],
+                             [b'U', b'VV', b'WWW'])
+
+    def test_write_batch(self):
+        batch = exact_batch()
+        self.assertEqual(tuple(batch.timestamps), EXACT_TIMESTAMPS)
+
+        with capture.Recorder(self.path) as recorder:
+            recorder.write_batch(batch, port=1)
+
+        with capture.Reader(self.path) as reader:
+            self.assertEqual(tuple(reader.timestamps), EXACT_TIMESTAMPS)
+            self.assertEqual(list(reader.statuses), [4, 4])
+            self.assertEqual(list(reader.ports), [1, 1])
+            self.assertEqual([bytes(record.data) for record in reader],
+                             [b'UU', b'VV'])
+
+    def test_reader(self):
+        with capture.Recorder(self.path) as recorder:
+            recorder.write(b'U', b'\x04\x00', 1000)
+            recorder.write(b'VV', None, 2000, port=1)
+
+        with capture.Reader(self.path) as reader:
+            self.assertEqual(len(reader), 2)
+            self.assertEqual(reader.find(1500), 1)
+            self.assertEqual(list(reader.lengths), [1, 2])
+            self.assertEqual(list(reader.timestamps), [1000, 2000])
+
+            port, data, status, timestamp = reader[1]
+            self.assertEqual((port, status, timestamp), (1, None, 2000))
+            self.assertEqual(data, b'VV')
+            data.release()
+
+
+    def test_pcap(self):
+        path = self.path + '.pcapng'
+
+        with pcap.Writer(path) as writer:
+            writer.write(b'U', b'\x04\x00', 1000, port=1)
+
+        with pcap.Reader(path) as reader:
+            port, data, status, timestamp = next(iter(reader))
+
+        self.assertEqual((port, status, timestamp), (1, 4, 1000))
+        self.assertEqual(data, b'U')
+
+    def test_pcap_write_batch(self):
+        path = self.path + '.pcapng'
+
+        with pcap.Writer(path) as writer:
+            writer.write_batch(exact_batch(), port=1)
+
+        with pcap.Reader(path) as reader:
+            records = list(reader)
+
+        self.assertEqual(tuple(record.timestamp for record in records),
+                         EXACT_TIMESTAMPS)
+        self.assertEqual([(record.port, record.status, bytes(record.data))
+                          for record in records],
+                         [(1, 4, b'UU'), (1, 4, b'VV')])
+
+    def test_pcap_corrupt(self):
+        path = self.path + '.pcapng'
+
+        with pcap.Writer(path) as writer:
+            writer.write(b'UU', b'\x04\x00', 1000)
+
+        with open(path, 'rb') as f:
+            contents = f.read()
+
+        # The interface block's length set to 0, then the packet truncated
+        second = int.from_bytes(contents[4:8], 'little')
+        zero_length = bytearray(contents)
+        zero_length[second + 4:second + 8] = bytes(4)
+
+        for corrupt in (zero_length, contents[:-6]):
+            with open(path, 'wb') as f:
+                f.write(corrupt)
+
+            with pcap.Reader(path) as reader:
+                with self.assertRaises(ValueError):
+                    list(reader)
+
+
+class ClusterTestCase(unittest.TestCase):
+    def test_recv(self):
+        with Cluster([0], workers=1) as cluster:
+            cluster.set(0, 'append_status', True)
+            cluster.set(0, 'append_timestamp', False)
+            cluster.call(0, 'purge')
+            cluster.call(0, 'write', b'U')
+            port_num, data, status, timestamp = cluster.recv(1000)
+
+        self.assertEqual(port_num, 0)
+        self.assertEqual(data, b'U')
+        self.assertEqual(len(status), 2)
+        self.assertIsNone(timestamp)
+
+
+class AsyncTestCase(FsccTestCase):
+    def test_read_write(self):
+        async def loopback():
+            port = aio.Port(self.port)
+            await port.write(b'U')
+            return await port.read(1000)
+
+        data = asyncio.run(loopback())
+        self.assertEqual(data[0], b'U')
+
+
+@unittest.skipUnless(os.path.exists('/dev/fscc0'), 'No fscc-linux port')
+class LinuxBackendTestCase(FsccTestCase):
+    def test_read_write(self):
+        port = Port(0, backend='linux')
+
+        try:
+            self.assertEqual(port.append_status, self.port.append_status)
+            port.write(b'U')
+            data = port.read(1000)
+        finally:
+            port.close()
+
+        self.assertEqual(data[0], b'U')
+        self.assertEqual(len(data[1]), 2)
+
+
+class CfsccBackendTestCase(unittest.TestCase):
+    def test_concurrent_calls(self):
+        handle = CfsccBackend.Handle(0, None)
+        written = []
+
+        def read(arg, buf, size, bytes_read):
+            bytes_read._obj.value = size
+
+            # Another thread writes before the read returns
+            thread = threading.Thread(target=lambda: written.append(
+                backend.write(handle, b'U')))
+            thread.start()
+            thread.join()
+            return 0
+
+        def write(arg, data, size, bytes_written):
+            bytes_written._obj.value = size
+            return 0
+
+        backend = CfsccBackend(types.SimpleNamespace(
+            unchecked_fscc_read_with_blocking=read,
+            unchecked_fscc_read_with_timeout=None,
+            unchecked_fscc_write_with_blocking=write))
+
+        self.assertEqual(backend.read(handle, None, 100), 100)
+        self.assertEqual(written, [1])
+        self.assertEqual(backend.write(handle, b'UU'), 2)
+
+
+class ClockTestCase(unittest.TestCase):
+    def test_calculate(self):
+        for frequency in (15000, 1000000, 18432000, 50000000):
+            settings = clock.calculate(frequency)
+            self.assertLessEqual(abs(clock.frequency(settings) - frequency),
+                                 frequency * clock.PPM / 1000000)
+
+        self.assertEqual(clock.frequency(clock.calculate(18432000)),
+                         18432000)
+        self.assertRaises(InvalidParameterError, clock.calculate, 14999)
+        self.assertRaises(InvalidParameterError, clock.calculate, 270000001)
+
+    @unittest.skipUnless(os.name == 'posix', 'needs fcntl')
+    def test_linux_backend(self):
+        calls = []
+        backend = LinuxBackend()
+        backend.ioctl = lambda fd, request, arg, mutate: calls.append(
+            (fd, request, bytes(arg)))
+
+        backend.set_clock_frequency(types.SimpleNamespace(fd=3), 1000000)
+
+        # _IOW(0x18, 8, unsigned char[20])
+        self.assertEqual(calls, [(3, 0x40141808, clock.clock_bits(1000000))])
+
+        word = int.from_bytes(calls[0][2], 'little')
+        settings = clock.calculate(1000000)
+        self.assertEqual(word & 0x7f, settings.reference_divider)
+        self.assertEqual(word >> clock.VCO_SHIFT & 0x7ff, settings.vco_divider)
+        self.assertEqual(word >> clock.OUTPUT_SHIFT, settings.output_divider)
+
+    def test_sim_backend(self):
+        backend = SimBackend(pacing=False)
+        port = Port(0, backend=backend)
+        port.clock_frequency = 1000000
+        self.assertEqual(backend.ports[0].clock_frequency, 1000000)
+
+
+class SimTestCase(unittest.TestCase):
+    def test_pair(self):
+        backend = SimBackend(pairs=[(0, 1)], pacing=False)
+        port0 = Port(0, backend=backend)
+        port1 = Port(1, backend=backend)
+
+        port0.write(b'U')
+        self.assertEqual(port1.read(100)[0], b'U')
+        self.assertEqual(port0.read(1), (None, None, None))
+
+    def test_pacing(self):
+        backend = SimBackend(clock_frequency=1000000)
+        port = Port(0, False, False, backend=backend)
+        port.registers.BGR = 9
+
+        start = time.time()
+        port.write(bytes(121))
+        self.assertEqual(port.read(1000)[0], bytes(121))
+
+        # 125 bytes with the flags and CRC at 100 kbit/s
+        self.assertGreaterEqual(time.time() - start, 0.01)
+
 
 class RegisterTestCase(FsccTestCase):
     def setUp(self):
@@ -134,6 +672,89 @@ class RegisterTestCase(FsccTestCase):
                 setattr(self.port.registers, self.reg_name, reg_val)
 
 
+class BulkRegisterTestCase(FsccTestCase):
+    def test_snapshot(self):
+        self.port.registers.BGR = 0x10
+        snapshot = self.port.registers.snapshot()
+        self.assertEqual(snapshot['BGR'], 0x10)
+        self.assertNotIn('CMDR', snapshot)
+
+        with self.assertRaises(TypeError):
+            snapshot['BGR'] = 0
+
+    def test_batch(self):
+        with self.port.registers.batch():
+            self.port.registers.BGR = 0x10
+            self.port.registers.TCR = 0x20
+
+        self.assertEqual(self.port.registers.BGR, 0x10)
+        self.assertEqual(self.port.registers.TCR, 0x20)
+
+    def test_update(self):
+        self.port.registers.update({'BGR': 0x30, 'TCR': 0x40})
+        self.assertEqual(self.port.registers.BGR, 0x30)
+        self.assertEqual(self.port.registers.TCR, 0x40)
+
+    def test_fields(self):
+        self.port.registers.FIFOT = 0x08001000
+        fifot = self.port.registers.fields.FIFOT
+        self.assertEqual(fifot.rft, 0x1000)
+        self.assertEqual(fifot.tft, 0x0800)
+
+    def test_star_fields(self):
+        value = fields.STAR.encode(0, ce=1)
+        self.assertEqual(value, 0x00040000)
+        self.assertEqual(fields.STAR.decode(value)['ce'], 1)
+        self.assertEqual(fields.STAR.encode(value, ce=0), 0)
+        self.assertRaises(ValueError, fields.STAR.encode, ce=2)
+        self.assertIn(self.port.registers.fields.STAR.ce, (0, 1))
+
+        status = fields.STAR.decode(0x01010006)
+        self.assertEqual([name for name, bit in sorted(status.items()) if bit],
+                         ['ctss', 'rfe', 'rft', 'tft'])
+
+    def test_register_coverage(self):
+        self.assertEqual(sorted(fields.registers),
+                         sorted(self.port.registers.register_names))
+
+        for register in fields.registers.values():
+            used = 0
+            for field in register:
+                bits = field.mask << field.shift
+                self.assertFalse(used & bits, field)
+                self.assertLess(bits, 1 << 32, field)
+                used |= bits
+
+        self.assertEqual(fields.CMDR.encode(xf=1, rres=1), 0x01020000)
+        self.assertEqual(fields.IMR.encode(tdu=1), 0x00040000)
+        self.assertEqual(fields.PPR.decode(0x02017e55),
+                         {'pre': 0x55, 'post': 0x7e, 'npre': 1, 'npost': 2})
+
+    def test_decode_many(self):
+        values = [0x08001000, 0x00200010, 0]
+
+        decoded = fields.FIFOT.decode_many(values)
+        self.assertEqual(list(decoded['rft']), [0x1000, 0x10, 0])
+        self.assertEqual(list(decoded['tft']), [0x0800, 0x20, 0])
+        self.assertEqual(decoded['rft'].typecode, 'L')
+
+        ce = fields.STAR.ce.decode_many(iter([0x00040000, 0x00000004]))
+        self.assertEqual(list(ce), [1, 0])
+
+    def test_decode_many_numpy(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest('needs numpy')
+
+        values = numpy.array([0x08001000, 0x00200010, 0], dtype=numpy.uint32)
+
+        decoded = fields.FIFOT.decode_many(values)
+        self.assertIsInstance(decoded['rft'], numpy.ndarray)
+        self.assertEqual(decoded['rft'].tolist(), [0x1000, 0x10, 0])
+        self.assertEqual(decoded['tft'].tolist(), [0x0800, 0x20, 0])
+
+
 class FIFOT_TestCase(RegisterTestCase):
     def setUp(self):
         super().setUp()
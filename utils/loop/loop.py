@@ -15,22 +15,23 @@ def init(p):
     p.tx_modifiers = fscc.XF;
     p.ignore_timeout = False;
 
-    p.registers.FIFOT = 0x08001000
-    p.registers.CCR0 = 0x0011201c
-    p.registers.CCR1 = 0x00000018
-    p.registers.CCR2 = 0x00000000
-    p.registers.BGR = 0x00000000
-    p.registers.SSR = 0x0000007e
-    p.registers.SMR = 0x00000000
-    p.registers.TSR = 0x0000007e
-    p.registers.TMR = 0x00000000
-    p.registers.RAR = 0x00000000
-    p.registers.RAMR = 0x00000000
-    p.registers.PPR = 0x00000000
-    p.registers.TCR = 0x00000000
-    p.registers.IMR = 0x0f000000
-    p.registers.DPLLR = 0x00000004
-    p.registers.FCR = 0x00000000
+    with p.registers.batch():
+        p.registers.FIFOT = 0x08001000
+        p.registers.CCR0 = 0x0011201c
+        p.registers.CCR1 = 0x00000018
+        p.registers.CCR2 = 0x00000000
+        p.registers.BGR = 0x00000000
+        p.registers.SSR = 0x0000007e
+        p.registers.SMR = 0x00000000
+        p.registers.TSR = 0x0000007e
+        p.registers.TMR = 0x00000000
+        p.registers.RAR = 0x00000000
+        p.registers.RAMR = 0x00000000
+        p.registers.PPR = 0x00000000
+        p.registers.TCR = 0x00000000
+        p.registers.IMR = 0x0f000000
+        p.registers.DPLLR = 0x00000004
+        p.registers.FCR = 0x00000000
 
     p.clock_frequency = 18432000
 